@@ -1,5 +1,5 @@
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, replace
 
 
 @dataclass
@@ -30,10 +30,65 @@ class Config:
     # --- 중복제거 파라미터 ---
     # TextUnisim
     UNISIM_THRESHOLD: float = 0.99
+    TEXT_ENCODING_PROBE_BYTES: int = 64 * 1024  # 인코딩 판별에 사용할 파일 앞부분 크기
+    # 문서 단위 판별은 문서 하나를 통째로 디코딩하므로, 이 크기 이상의 파일이 있으면
+    # 전체 코퍼스를 윈도우 모드(mmap + TEXT_READ_CHUNK_BYTES 단위 청크 스트리밍)로 판별한다.
+    # 분산 모드의 노드는 이런 파일을 거부한다.
+    TEXT_MMAP_THRESHOLD: int = 64 * 1024 * 1024
+    TEXT_READ_CHUNK_BYTES: int = 16 * 1024 * 1024
+    # 장문 윈도우 모드: 문서를 겹치는 윈도우로 나눠 임베딩하고 매칭 커버리지로 중복 판정.
+    # 윈도우 경계는 고정 오프셋이 아니라 내용(롤링 해시)으로 정해지므로, 같은 장(chapter)이
+    # 문서마다 다른 위치에 있어도 장 내부에서는 같은 윈도우가 만들어진다.
+    # 한계: 공유 구간의 처음/끝 윈도우는 주변 내용이 섞여 매칭되지 않을 수 있고, 구간 안의
+    # 편집은 주변 1~2개 윈도우를 바꾼다. 윈도우 2~3개보다 짧은 공유 구간은 잡기 어렵다.
+    TEXT_WINDOW_MODE: bool = False
+    TEXT_WINDOW_CHARS: int = 2000  # 평균 윈도우 길이 (문자 수, 구간 길이는 평균의 약 1/4 ~ 2배)
+    TEXT_WINDOW_OVERLAP: int = 200  # 각 윈도우 앞에 붙이는 직전 구간 문자 수
+    # 윈도우 내용 해시로 약 1/N 만 사용 (1 = 전부). 모든 문서에 같은 기준을 적용하므로 공유 구간의 윈도우는 함께 남음
+    TEXT_WINDOW_SAMPLE_RATE: int = 1
+    TEXT_WINDOW_BATCH_SIZE: int = 64  # 한 번에 임베딩할 윈도우 수
+    TEXT_WINDOW_THRESHOLD: float = 0.95  # 윈도우 매칭 유사도 (윈도우 경계가 조금 어긋나도 잡히도록 문서 단위보다 낮음)
+    TEXT_WINDOW_COVERAGE: float = 0.8  # 중복 판정에 필요한 매칭 윈도우 비율
+    # 멀티프로세스: 1 이면 순차 처리(UniSim 검색, 정확), 2 이상이면 임베딩과 SimHash 밴드(LSH) 버킷별
+    # 비교를 워커에 나눔. 병렬 모드와 분산 모드의 리듀서는 근사이며 순차 모드와 유지 파일이 다를 수 있음:
+    # 어떤 밴드도 겹치지 않는 쌍은 비교하지 않고, 버킷 안에서는 버킷의 유지 문서와만 비교한다.
+    TEXT_NUM_WORKERS: int = 1
+    TEXT_EMBED_BATCH_SIZE: int = 64  # 워커에서 한 번에 임베딩할 문서 수
+    # 밴드가 많을수록 / 밴드 비트가 적을수록 재현율이 높고 후보가 많아짐.
+    # 기본값(16×16)에서 유사도 0.99 쌍이 어떤 밴드도 공유하지 않을 확률은 (1 - 0.955^16)^16 ≈ 3e-5
+    TEXT_LSH_BANDS: int = 16
+    TEXT_LSH_BAND_BITS: int = 16
+    TEXT_LSH_SEED: int = 0
     # ImageFiftyOne
     FIFTYONE_MODEL: str = "mobilenet-v2-imagenet-torch"
     FIFTYONE_THRESHOLD: float = 0.98
     FIFTYONE_BATCH_SIZE: int = 1
+    # 임베딩 저장 방식: "float32"(전체 정밀도)
+    #   | "int8"(int8 코드 + 부호 비트, float32 대비 약 3.5배 절감)
+    #   | "binary"(메모리에는 부호 비트만, 재채점용 float32 는 디스크 memmap)
+    # 양자화 모드에서도 FIFTYONE_VERIFY_QUANT 가 켜져 있으면 float32 전체를 메모리에 유지한다.
+    FIFTYONE_EMBEDDING_MODE: str = "float32"
+    FIFTYONE_HAMMING_RADIUS: float = 0.25  # 해밍 사전필터 반경 (전체 비트 수 대비 비율)
+    FIFTYONE_BLOCK_SIZE: int = 256  # 해밍 거리 계산 / 재채점 타일 크기 (행 수)
+    FIFTYONE_VERIFY_QUANT: bool = False  # True 면 float32 그룹핑과의 일치도를 함께 로깅
+
+    # --- 리소스 거버너 (배치 크기 / 워커 수 자동 조절) ---
+    # 각 *_BATCH_SIZE / COPY_WORKERS 는 초기값이며, 측정된 메모리와 처리량에 따라 조절된다.
+    GOVERNOR_RSS_BUDGET_MB: int = 0  # 프로세스 RSS 예산 (0 = 물리 메모리의 75%)
+    GOVERNOR_MIN_FREE_MB: int = 1024  # 시스템 가용 메모리가 이보다 적으면 축소
+    GOVERNOR_LATENCY_BUDGET: float = 60.0  # 배치 하나의 최대 처리 시간(초), 0 = 제한 없음
+    GOVERNOR_MAX_BATCH: int = 256
+    GOVERNOR_MAX_WORKERS: int = 0  # PDF 렌더링 / 파일 복사 최대 워커 수 (0 = CPU 코어 수)
+    MINICPM_BATCH_SIZE: int = 1
+    COPY_WORKERS: int = 4
+
+    # --- 분산 모드 (공유 디렉터리 작업 큐) ---
+    DIST_QUEUE_DIR: Path = WORK_DIR / "queue"  # 모든 노드가 접근 가능한 공유 스토리지 경로
+    DIST_SHARD_SIZE: int = 500  # 샤드당 입력 파일 수
+    DIST_LEASE_TIMEOUT: float = 1800.0  # 하트비트가 이 시간(초) 이상 끊긴 리스는 회수
+    DIST_MAX_ATTEMPTS: int = 3  # 샤드 처리 실패(예외 또는 리스 만료)가 이 횟수에 도달하면 failed 로 옮기고 재시도하지 않음
+    DIST_HEARTBEAT_INTERVAL: float = 60.0
+    DIST_POLL_INTERVAL: float = 10.0
 
     # 파라미터
     MAX_ITER: int = 2
@@ -52,4 +107,17 @@ def ensure_dirs(cfg: "Config") -> None:
         cfg.MINERU_OUTPUT_DIR_PASS1,
         cfg.MINERU_OUTPUT_DIR_PASS2,
     ]:
-        d.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+        d.mkdir(parents=True, exist_ok=True)
+
+
+def with_work_dir(cfg: "Config", work_dir: Path) -> "Config":
+    """WORK_DIR 하위 경로를 모두 work_dir 기준으로 옮긴 Config 사본을 반환한다.
+
+    공유 스토리지인 DIST_QUEUE_DIR 은 옮기지 않는다.
+    """
+    changes = {"WORK_DIR": work_dir}
+    for f in fields(cfg):
+        value = getattr(cfg, f.name)
+        if f.name not in ("WORK_DIR", "DIST_QUEUE_DIR") and isinstance(value, Path) and value.is_relative_to(cfg.WORK_DIR):
+            changes[f.name] = work_dir / value.relative_to(cfg.WORK_DIR)
+    return replace(cfg, **changes)
@@ -19,14 +19,20 @@ class Dispatcher:
         self.img_collector = ImageCollector(cfg)
 
     def run(self, input_dir: Path):
-        files: Iterable[Path] = input_dir.rglob("*.*")
-        with progress_bar(files, desc="Dispatching") as pbar:
-            for fp in pbar:
-                if fp.suffix.lower() == ".txt":
-                    self.txt_collector.copy(fp)
-                elif fp.suffix.lower() == ".pdf":
-                    self.pdf_converter.convert(fp)
-                elif fp.suffix.lower() in self.SUPPORTED_IMAGE_EXT:
-                    self.img_collector.copy(fp)
-                else:
-                    self.logger.warning("Unsupported file skipped: %s", fp)
\ No newline at end of file
+        self.dispatch(input_dir.rglob("*.*"))
+
+    def dispatch(self, files: Iterable[Path]):
+        try:
+            with progress_bar(files, desc="Dispatching") as pbar:
+                for fp in pbar:
+                    if fp.suffix.lower() == ".txt":
+                        self.txt_collector.copy(fp)
+                    elif fp.suffix.lower() == ".pdf":
+                        self.pdf_converter.convert(fp)
+                    elif fp.suffix.lower() in self.SUPPORTED_IMAGE_EXT:
+                        self.img_collector.copy(fp)
+                    else:
+                        self.logger.warning("Unsupported file skipped: %s", fp)
+        finally:
+            # PDF 렌더링 워커 풀은 PDF 간에 재사용하고, 디스패치가 끝나면 정리
+            self.pdf_converter.close()
\ No newline at end of file
@@ -0,0 +1,192 @@
+from pathlib import Path
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import socket
+import time
+
+import numpy as np
+
+from .dispatcher import Dispatcher
+from .work_queue import WorkQueue
+from ..config import Config, ensure_dirs, with_work_dir
+from ..logging_conf import setup_logging
+from ..postproc.image_cleaner import ImageCleaner
+from ..dedup.text_unisim import TextUnisim
+from ..dedup.image_fiftyone import ImageFiftyOne
+from ..utils.path_utils import cleanup_temp_dirs
+
+
+def default_node_id() -> str:
+    # 리스 파일명에서 '.' 을 구분자로 쓰므로 제거
+    return f"{socket.gethostname()}-{os.getpid()}".replace(".", "_")
+
+
+def _run_local_node(cfg: Config, node_id: str) -> None:
+    """로컬 모드에서 노드 역할을 하는 자식 프로세스 진입점."""
+    DistributedRunner(cfg).work(node_id)
+
+
+class DistributedRunner:
+    """공유 디렉터리 작업 큐를 이용한 다중 노드 실행.
+
+    1. plan   : 입력 파일을 샤드로 나눠 큐에 등록 (한 번만 실행)
+    2. work   : 각 노드가 샤드를 리스해 Dispatch → ImageCleaner 를 로컬 WORK_DIR 에서 수행하고,
+                텍스트/이미지와 임베딩 시그니처를 results/<shard> 로 게시
+    3. reduce : 모든 샤드가 끝나면 게시된 시그니처로 전역 중복 제거를 수행
+
+    샤드 처리 중 예외가 나면 리스를 반납해 다시 시도하고, DIST_MAX_ATTEMPTS 번 실패한 샤드는
+    failed/ 로 옮긴다. 실패한 샤드가 있으면 reduce 는 결과를 만들지 않고 오류를 낸다.
+    """
+
+    def __init__(self, cfg: Config):
+        self.cfg = cfg
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.queue = WorkQueue(cfg.DIST_QUEUE_DIR, cfg.DIST_LEASE_TIMEOUT, cfg.DIST_MAX_ATTEMPTS)
+        if cfg.TEXT_WINDOW_MODE:
+            # 리듀서는 문서 단위 임베딩만 비교함
+            self.logger.warning("TEXT_WINDOW_MODE is not supported in distributed mode; using whole-document dedup.")
+
+    def plan(self, input_dir: Path) -> list[str]:
+        files = sorted(str(p) for p in input_dir.rglob("*.*") if p.is_file())
+        size = self.cfg.DIST_SHARD_SIZE
+        shards = [files[i:i + size] for i in range(0, len(files), size)]
+        return self.queue.plan(shards)
+
+    def work(self, node_id: str) -> None:
+        """큐가 빌 때까지 샤드를 가져와 처리한다."""
+        node_cfg = with_work_dir(self.cfg, self.cfg.WORK_DIR / f"node_{node_id}")
+        ensure_dirs(node_cfg)
+        setup_logging(node_cfg)
+        dispatcher = Dispatcher(node_cfg)
+        cleaner = ImageCleaner(node_cfg)
+        text = TextUnisim(node_cfg)
+        image = ImageFiftyOne(node_cfg)
+
+        while True:
+            shard_id = self.queue.acquire(node_id)
+            if shard_id is None:
+                if self.queue.finished():
+                    break
+                # 다른 노드가 처리 중인 샤드가 남아 있음: 만료된 리스를 회수하며 대기
+                if not self.queue.reclaim_expired():
+                    time.sleep(self.cfg.DIST_POLL_INTERVAL)
+                continue
+
+            self.logger.info("Node %s processing %s", node_id, shard_id)
+            try:
+                with self.queue.keep_alive(shard_id, node_id, self.cfg.DIST_HEARTBEAT_INTERVAL):
+                    files = [Path(f) for f in self.queue.load(shard_id, node_id)]
+                    cleanup_temp_dirs(node_cfg)
+                    ensure_dirs(node_cfg)
+                    dispatcher.dispatch(files)
+                    cleaner.run(node_cfg.TEMP1_DIR)
+                    self._publish_shard(shard_id, node_id, text, image)
+            except Exception as e:
+                # 샤드 하나의 실패로 노드를 멈추지 않고, 리스를 바로 반납해 재시도되도록 함
+                self.logger.exception("Node %s failed on %s", node_id, shard_id)
+                self.queue.release(shard_id, node_id, f"{node_id}: {type(e).__name__}: {e}")
+                continue
+            self.queue.complete(shard_id, node_id)
+        cleanup_temp_dirs(node_cfg)
+        self.logger.info("Node %s finished: no shards left.", node_id)
+
+    def _publish_shard(self, shard_id: str, node_id: str, text: TextUnisim, image: ImageFiftyOne) -> None:
+        """샤드 산출물과 시그니처(임베딩)를 게시한다."""
+        stage = self.queue.staging_dir(shard_id, node_id)
+        text_paths, text_emb = text.embed_shard()
+        image_paths, image_emb = image.embed_dir()
+
+        for sub, paths in (("texts", text_paths), ("images", image_paths)):
+            (stage / sub).mkdir()
+            for p in paths:
+                shutil.copy2(p, stage / sub / Path(p).name)
+
+        np.savez(
+            stage / "signatures.npz",
+            text_names=np.array([Path(p).name for p in text_paths], dtype=str),
+            text_emb=text_emb if text_emb is not None else np.empty((0, 0), dtype=np.float32),
+            image_names=np.array([Path(p).name for p in image_paths], dtype=str),
+            image_emb=image_emb if image_emb is not None else np.empty((0, 0), dtype=np.float32),
+        )
+        self.queue.publish(shard_id, node_id)
+        self.logger.info(
+            "Published %s: %d texts, %d images", shard_id, len(text_paths), len(image_paths)
+        )
+
+    def reduce(self, wait: bool = True) -> None:
+        """모든 샤드 완료를 기다린 뒤, 샤드 순서대로 시그니처를 모아 전역 중복 제거한다.
+
+        wait=False 면 기다리지 않고, 남은 샤드가 있으면 바로 오류를 낸다 (노드가 모두 종료된 뒤 호출).
+        wait=True 여도 처리 중인 리스 없이 DIST_LEASE_TIMEOUT 이상 진행이 없으면 노드가 없다고 보고 오류를 낸다.
+        """
+        last_active = time.monotonic()
+        while not self.queue.finished():
+            if not wait:
+                self._raise_unfinished("all nodes have exited")
+            if self.queue.reclaim_expired() or self.queue.has_leases():
+                last_active = time.monotonic()
+            elif time.monotonic() - last_active >= self.cfg.DIST_LEASE_TIMEOUT:
+                self._raise_unfinished(f"no node has held a lease for {self.cfg.DIST_LEASE_TIMEOUT:.0f}s")
+            time.sleep(self.cfg.DIST_POLL_INTERVAL)
+
+        failed = self.queue.failed_shards()
+        if failed:
+            for shard_id, errors in failed.items():
+                self.logger.error("Shard %s failed: %s", shard_id, errors[-1])
+            raise RuntimeError(
+                f"{len(failed)} shards failed after {self.cfg.DIST_MAX_ATTEMPTS} attempts "
+                f"(see {self.queue.failed_dir}): {', '.join(failed)}"
+            )
+
+        text_paths, text_embs = [], []
+        image_paths, image_embs = [], []
+        for shard_id in self.queue.shard_ids():
+            d = self.queue.result_dir(shard_id)
+            sig = np.load(d / "signatures.npz")
+            if len(sig["text_names"]):
+                text_paths += [str(d / "texts" / n) for n in sig["text_names"]]
+                text_embs.append(sig["text_emb"])
+            if len(sig["image_names"]):
+                image_paths += [str(d / "images" / n) for n in sig["image_names"]]
+                image_embs.append(sig["image_emb"])
+
+        self.logger.info("--- Running Text Deduplication (global) ---")
+        if text_paths:
+            text = TextUnisim(self.cfg)
+            kept, dup_map = text.dedup_embeddings(text_paths, np.concatenate(text_embs))
+            self.logger.info(f"Total: {len(text_paths)}, Kept: {len(kept)}, Duplicates: {len(dup_map)}")
+            text.save_results(kept, dup_map)
+        else:
+            self.logger.warning("No text files were published.")
+
+        self.logger.info("--- Running Image Deduplication (global) ---")
+        if image_paths:
+            image = ImageFiftyOne(self.cfg)
+            kept, dup_map = image.dedup_embeddings(image_paths, np.concatenate(image_embs))
+            image.save_results(kept, dup_map)
+        else:
+            self.logger.warning("No image files were published.")
+
+    def run_local(self, input_dir: Path, num_nodes: int) -> None:
+        """한 머신에서 num_nodes 개의 로컬 프로세스를 노드 삼아 plan → work → reduce 를 실행한다."""
+        self.plan(input_dir)
+        ctx = mp.get_context("spawn")
+        procs = [
+            ctx.Process(target=_run_local_node, args=(self.cfg, f"local{i}"))
+            for i in range(num_nodes)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+            if p.exitcode != 0:
+                self.logger.error("Local node exited with code %s", p.exitcode)
+        self.reduce(wait=False)
+
+    def _raise_unfinished(self, reason: str) -> None:
+        unfinished = self.queue.unfinished_shards()
+        raise RuntimeError(
+            f"{len(unfinished)} shards are unfinished and {reason}: {', '.join(unfinished[:10])}"
+        )
@@ -1,21 +1,96 @@
 import logging
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing as mp
 import pymupdf as fitz  # PyMuPDF 바인딩 (import fitz 로도 사용 가능)
 
 from ..utils.path_utils import safe_move  # 필요 시 사용, 현재는 직접 저장
+from ..utils.resource_governor import ResourceGovernor, current_rss, max_workers
+
+RENDER_DPI = 1200
+
+
+def _render_pages(pdf_path: Path, page_numbers: list[int], out_dir: Path) -> tuple[list[Path], int]:
+    """지정한 페이지들을 PNG 로 저장한다. (워커 프로세스에서도 호출됨)
+
+    (저장 경로 목록, 페이지 하나를 렌더링/저장하는 동안 측정한 최대 메모리 사용량) 을 반환한다.
+    """
+    saved = []
+    peak = 0
+    with fitz.open(pdf_path) as doc:
+        for no in page_numbers:
+            rss0 = current_rss()
+            pix = doc[no].get_pixmap(dpi=RENDER_DPI)
+            out_path = out_dir / f"{pdf_path.stem}_p{no + 1}.png"
+            pix.save(out_path)
+            # 해제된 메모리를 재사용하면 RSS 증가분이 0 에 가까우므로 픽스맵 크기와 비교
+            peak = max(peak, current_rss() - rss0, pix.size)
+            saved.append(out_path)
+            pix = None
+    return saved, peak
+
 
 class PdfConverter:
-    """주어진 PDF 파일을 각 페이지별 PNG로 저장해 TEMP1_DIR 에 배치."""
+    """주어진 PDF 파일을 각 페이지별 PNG로 저장해 TEMP1_DIR 에 배치.
+
+    렌더링 워커 풀은 처음 필요할 때 한 번 만들어 여러 PDF 에 재사용하며, close() 로 정리한다.
+    """
 
     def __init__(self, cfg):
         self.cfg = cfg
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.governor = ResourceGovernor.from_config(
+            cfg, "pdf-render", max_workers(cfg), maximum=max_workers(cfg)
+        )
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.governor.maximum, mp_context=mp.get_context("spawn")
+            )
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
     def convert(self, pdf_path: Path):
         self.logger.info("Converting PDF → images: %s", pdf_path)
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            pix = page.get_pixmap(dpi=1200)
-            out_path = self.cfg.TEMP1_DIR / f"{pdf_path.stem}_p{page.number + 1}.png"
-            pix.save(out_path)
-            self.logger.debug("Saved: %s", out_path)
\ No newline at end of file
+        with fitz.open(pdf_path) as doc:
+            n_pages = len(doc)
+            # 페이지 하나의 픽스맵(RGB) 크기 추정치. 이전 PDF 에서 측정한 값이 더 크면 그 값을 사용
+            page_bytes = max(
+                int(p.rect.width * RENDER_DPI / 72) * int(p.rect.height * RENDER_DPI / 72) * 3
+                for p in doc
+            ) if n_pages else 0
+        page_bytes = max(page_bytes, int(self.governor.item_bytes))
+        workers = min(self.governor.fit(page_bytes), n_pages)
+
+        if workers <= 1:
+            saved, peak = _render_pages(pdf_path, list(range(n_pages)), self.cfg.TEMP1_DIR)
+        else:
+            self.logger.debug("Rendering %d pages with %d workers", n_pages, workers)
+            # 풀의 프로세스 수와 무관하게 작업을 workers 개로 나눠 동시 렌더링 수를 제한
+            chunks = [list(range(i, n_pages, workers)) for i in range(workers)]
+            try:
+                pool = self._get_pool()
+                futures = [
+                    pool.submit(_render_pages, pdf_path, chunk, self.cfg.TEMP1_DIR)
+                    for chunk in chunks
+                ]
+                results = [fut.result() for fut in futures]
+                saved = [p for paths, _ in results for p in paths]
+                peak = max(p for _, p in results)
+            except (BrokenProcessPool, MemoryError):
+                # 메모리 부족으로 워커가 죽으면 풀을 새로 만들도록 버리고, 다음 PDF 부터 워커 수를 줄이며
+                # 이번 PDF 는 순차 처리
+                self.logger.warning("Parallel rendering failed for %s; retrying serially.", pdf_path)
+                self.close()
+                self.governor.shrink("render worker crashed")
+                saved, peak = _render_pages(pdf_path, list(range(n_pages)), self.cfg.TEMP1_DIR)
+        self.governor.observe_item_bytes(peak)
+        for out_path in saved:
+            self.logger.debug("Saved: %s", out_path)
@@ -0,0 +1,207 @@
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+
+class WorkQueue:
+    """공유 디렉터리 위의 리스(lease) 기반 샤드 작업 큐.
+
+    모든 상태 전이는 같은 파일 시스템 내 os.rename 한 번으로 이뤄지므로
+    여러 노드가 동시에 시도해도 한 노드만 성공한다.
+
+        pending/<shard>.json          대기 중인 샤드 (입력 파일 목록)
+        leases/<shard>.<node>.json    node 가 처리 중인 샤드 (mtime = 마지막 하트비트)
+        done/<shard>.json             처리 완료된 샤드
+        failed/<shard>.json           max_attempts 번 실패해 더 이상 시도하지 않는 샤드 (오류 기록 포함)
+        results/<shard>/              샤드별 산출물 (텍스트, 이미지, 시그니처)
+    """
+
+    def __init__(self, root: Path, lease_timeout: float, max_attempts: int = 3):
+        self.root = root
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.pending_dir = root / "pending"
+        self.lease_dir = root / "leases"
+        self.done_dir = root / "done"
+        self.failed_dir = root / "failed"
+        self.results_dir = root / "results"
+        self.manifest_path = root / "manifest.json"
+        for d in [self.pending_dir, self.lease_dir, self.done_dir, self.failed_dir, self.results_dir]:
+            d.mkdir(parents=True, exist_ok=True)
+
+    def plan(self, shards: list[list[str]]) -> list[str]:
+        """샤드 목록을 큐에 등록하고 샤드 ID 목록을 반환한다."""
+        if self.manifest_path.exists():
+            raise RuntimeError(f"Queue already planned: {self.manifest_path}")
+        shard_ids = [f"shard_{i:05d}" for i in range(len(shards))]
+        for shard_id, files in zip(shard_ids, shards):
+            self._write_json(self.pending_dir / f"{shard_id}.json", {"files": files, "attempts": 0, "errors": []})
+        # manifest 는 마지막에 기록: 존재하면 모든 샤드가 등록된 상태
+        self._write_json(self.manifest_path, {"shards": shard_ids})
+        self.logger.info("Planned %d shards in %s", len(shard_ids), self.root)
+        return shard_ids
+
+    def shard_ids(self) -> list[str]:
+        if not self.manifest_path.exists():
+            return []
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))["shards"]
+
+    def acquire(self, node_id: str) -> Optional[str]:
+        """대기 중인 샤드 하나를 node_id 로 리스한다. 없으면 None."""
+        for p in sorted(self.pending_dir.glob("*.json")):
+            shard_id = p.stem
+            try:
+                os.rename(p, self._lease_path(shard_id, node_id))
+            except FileNotFoundError:
+                continue  # 다른 노드가 먼저 가져감
+            self.heartbeat(shard_id, node_id)
+            return shard_id
+        return None
+
+    def load(self, shard_id: str, node_id: str) -> list[str]:
+        data = json.loads(self._lease_path(shard_id, node_id).read_text(encoding="utf-8"))
+        return data["files"]
+
+    def heartbeat(self, shard_id: str, node_id: str) -> None:
+        try:
+            os.utime(self._lease_path(shard_id, node_id))
+        except FileNotFoundError:
+            self.logger.warning("Lease lost for %s on node %s", shard_id, node_id)
+
+    @contextmanager
+    def keep_alive(self, shard_id: str, node_id: str, interval: float):
+        """with 블록 동안 백그라운드 스레드로 리스 하트비트를 갱신한다."""
+        stop = threading.Event()
+
+        def _beat():
+            while not stop.wait(interval):
+                self.heartbeat(shard_id, node_id)
+
+        t = threading.Thread(target=_beat, daemon=True)
+        t.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            t.join()
+
+    def staging_dir(self, shard_id: str, node_id: str) -> Path:
+        d = self.results_dir / f".{shard_id}.{node_id}.tmp"
+        if d.exists():
+            shutil.rmtree(d)
+        d.mkdir(parents=True)
+        return d
+
+    def publish(self, shard_id: str, node_id: str) -> None:
+        """스테이징 디렉터리를 결과 디렉터리로 원자적으로 옮긴다.
+
+        리스 회수로 같은 샤드를 두 노드가 처리한 경우 먼저 게시한 결과를 유지한다.
+        """
+        staging = self.results_dir / f".{shard_id}.{node_id}.tmp"
+        try:
+            os.rename(staging, self.result_dir(shard_id))
+        except OSError:
+            if not self.result_dir(shard_id).exists():
+                raise
+            self.logger.warning("Results for %s already published; discarding ours.", shard_id)
+            shutil.rmtree(staging)
+
+    def complete(self, shard_id: str, node_id: str) -> bool:
+        try:
+            os.rename(self._lease_path(shard_id, node_id), self.done_dir / f"{shard_id}.json")
+            return True
+        except FileNotFoundError:
+            self.logger.warning("Lease for %s was reclaimed before completion.", shard_id)
+            return False
+
+    def release(self, shard_id: str, node_id: str, error: str) -> None:
+        """처리에 실패한 샤드의 리스를 반납한다.
+
+        시도 횟수를 늘려 pending 으로 되돌리고, max_attempts 에 도달하면 failed 로 옮긴다.
+        """
+        shutil.rmtree(self.results_dir / f".{shard_id}.{node_id}.tmp", ignore_errors=True)
+        if not self._retire(self._lease_path(shard_id, node_id), shard_id, error):
+            self.logger.warning("Lease for %s was reclaimed before release.", shard_id)
+
+    def reclaim_expired(self) -> int:
+        """하트비트가 lease_timeout 이상 끊긴 리스를 회수한다.
+
+        노드가 샤드 처리 중 죽은 경우이므로 release 와 같이 시도 횟수에 포함한다.
+        """
+        now = time.time()
+        reclaimed = 0
+        for p in self.lease_dir.glob("*.json"):
+            try:
+                if now - p.stat().st_mtime < self.lease_timeout:
+                    continue
+            except FileNotFoundError:
+                continue  # 그 사이 완료되었거나 다른 노드가 회수함
+            shard_id, node_id = p.name.split(".")[:2]
+            if self._retire(p, shard_id, f"lease expired on node {node_id}"):
+                self.logger.warning("Reclaimed expired lease: %s", p.name)
+                reclaimed += 1
+        return reclaimed
+
+    def has_leases(self) -> bool:
+        """처리 중인 샤드가 있는지 여부."""
+        return any(self.lease_dir.glob("*.json"))
+
+    def failed_shards(self) -> dict[str, list[str]]:
+        """실패로 확정된 샤드와 시도별 오류 기록."""
+        return {
+            p.stem: json.loads(p.read_text(encoding="utf-8"))["errors"]
+            for p in sorted(self.failed_dir.glob("*.json"))
+        }
+
+    def unfinished_shards(self) -> list[str]:
+        """완료도 실패도 아닌 샤드 ID 목록."""
+        return [
+            s for s in self.shard_ids()
+            if not (self.done_dir / f"{s}.json").exists() and not (self.failed_dir / f"{s}.json").exists()
+        ]
+
+    def finished(self) -> bool:
+        """모든 샤드가 완료 또는 실패로 끝났는지 여부 (더 처리할 샤드가 없음)."""
+        if not self.manifest_path.exists():
+            return False
+        return not self.unfinished_shards()
+
+    def result_dir(self, shard_id: str) -> Path:
+        return self.results_dir / shard_id
+
+    def _lease_path(self, shard_id: str, node_id: str) -> Path:
+        return self.lease_dir / f"{shard_id}.{node_id}.json"
+
+    def _retire(self, lease: Path, shard_id: str, error: str) -> bool:
+        """리스를 먼저 선점(rename)한 뒤 시도 횟수를 기록해 pending 또는 failed 로 옮긴다.
+
+        다른 노드가 이미 완료/회수한 리스면 False.
+        """
+        claim = lease.with_name(f".{lease.name}.claim")
+        try:
+            os.rename(lease, claim)
+        except FileNotFoundError:
+            return False
+        data = json.loads(claim.read_text(encoding="utf-8"))
+        data["attempts"] = data.get("attempts", 0) + 1
+        data["errors"] = data.get("errors", []) + [error]
+        if data["attempts"] < self.max_attempts:
+            self._write_json(self.pending_dir / f"{shard_id}.json", data)
+        else:
+            self._write_json(self.failed_dir / f"{shard_id}.json", data)
+            self.logger.error("Shard %s failed %d times; moved to %s", shard_id, data["attempts"], self.failed_dir)
+        claim.unlink()
+        return True
+
+    @staticmethod
+    def _write_json(path: Path, data: dict) -> None:
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.rename(tmp, path)
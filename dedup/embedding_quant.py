@@ -0,0 +1,213 @@
+"""임베딩 양자화(int8 / 부호 이진화), 해밍 사전필터, SimHash LSH 밴드 유틸리티.
+
+전체 N×N 유사도 행렬을 만들지 않고, 블록 단위로 후보 쌍을 추려 그 자리에서
+코사인 유사도로 재채점한다. 이미지 임베딩은 배치 단위로 CodeStore 에 넣어 float32 전체 배열을
+메모리에 만들지 않는다. 텍스트 병렬 판별은 SimHash 밴드 버킷 단위로 후보를 비교한다.
+"""
+from pathlib import Path
+from typing import Iterator, Optional
+import numpy as np
+
+# 0~255 바이트 값별 set bit 개수 (popcount 룩업 테이블)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def l2_normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def quantize_int8(x: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 후 [-127, 127] 범위로 대칭 양자화한다.
+
+    코사인 유사도는 행별 스케일에 무관하므로 스케일 값은 저장하지 않는다.
+    """
+    x = l2_normalize(x)
+    scale = np.abs(x).max(axis=1, keepdims=True)
+    scale[scale == 0] = 1.0
+    return np.round(x / scale * 127.0).astype(np.int8)
+
+
+def binarize(vecs: np.ndarray, block_size: int) -> np.ndarray:
+    """평균 중심화 후 부호를 비트로 패킹한다. (N, ceil(D/8)) uint8.
+
+    ReLU 이후 특징은 대부분 양수라 중심화 없이 부호를 취하면 비트가 거의 모두 1이 된다.
+    vecs(int8 코드 또는 memmap)를 블록 단위로 읽으므로 임시 float32 배열은 블록 크기만큼만 생긴다.
+    """
+    n, dim = vecs.shape
+    total = np.zeros(dim, dtype=np.float64)
+    for s in range(0, n, block_size):
+        total += np.asarray(vecs[s:s + block_size], dtype=np.float64).sum(axis=0)
+    mean = (total / max(n, 1)).astype(np.float32)
+
+    bits = np.empty((n, (dim + 7) // 8), dtype=np.uint8)
+    for s in range(0, n, block_size):
+        block = np.asarray(vecs[s:s + block_size], dtype=np.float32)
+        bits[s:s + block_size] = np.packbits(block - mean > 0, axis=1)
+    return bits
+
+
+def iter_hamming_candidates(
+    bits: np.ndarray, max_dist: int, block_size: int
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """해밍 거리가 max_dist 이하인 (i, j), i < j 후보 쌍을 블록(타일) 단위로 생성한다.
+
+    호출 측에서 타일마다 바로 재채점하므로 전체 후보 목록은 메모리에 쌓이지 않는다.
+    """
+    n = bits.shape[0]
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        for j0 in range(i0, n, block_size):
+            j1 = min(j0 + block_size, n)
+            xor = np.bitwise_xor(bits[i0:i1, None, :], bits[None, j0:j1, :])
+            dist = _POPCOUNT[xor].sum(axis=2, dtype=np.int32)
+            mask = dist <= max_dist
+            if i0 == j0:
+                # 대각 블록은 자기 자신 및 중복 쌍 제외
+                mask &= np.triu(np.ones_like(mask), k=1)
+            ii, jj = np.nonzero(mask)
+            if len(ii):
+                yield ii.astype(np.int64) + i0, jj.astype(np.int64) + j0
+
+
+def pair_similarities(
+    vecs: np.ndarray, ii: np.ndarray, jj: np.ndarray, chunk_size: int = 65536
+) -> np.ndarray:
+    """(ii[k], jj[k]) 쌍의 코사인 유사도. vecs 는 int8 코드나 디스크 memmap 이어도 되며 해당 행만 읽는다."""
+    sims = np.empty(len(ii), dtype=np.float32)
+    for s in range(0, len(ii), chunk_size):
+        a = np.asarray(vecs[ii[s:s + chunk_size]], dtype=np.float32)
+        b = np.asarray(vecs[jj[s:s + chunk_size]], dtype=np.float32)
+        denom = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+        denom[denom == 0] = 1.0
+        sims[s:s + chunk_size] = np.einsum("ij,ij->i", a, b) / denom
+    return sims
+
+
+def rescore_pairs(
+    vecs: np.ndarray, ii: np.ndarray, jj: np.ndarray, threshold: float
+) -> list[tuple[int, int]]:
+    """후보 쌍의 코사인 유사도를 다시 계산해 threshold 초과 쌍만 반환한다."""
+    mask = pair_similarities(vecs, ii, jj) > threshold
+    return list(zip(ii[mask].tolist(), jj[mask].tolist()))
+
+
+def simhash_bands(
+    vecs: np.ndarray, n_bands: int, band_bits: int, seed: int, block_size: int = 65536
+) -> np.ndarray:
+    """랜덤 초평면 SimHash 비트를 band_bits 개씩 묶은 (N, n_bands) uint64 밴드 값.
+
+    코사인 유사도가 높은 두 벡터는 각 비트가 같을 확률이 1 - 각도/π 이므로,
+    밴드 하나가 통째로 같을 확률도 높다. 같은 seed 면 프로세스와 무관하게 같은 값이 나온다.
+    """
+    if not 0 < band_bits < 64:
+        raise ValueError("band_bits must be in [1, 63].")
+    planes = np.random.default_rng(seed).standard_normal(
+        (vecs.shape[1], n_bands * band_bits)
+    ).astype(np.float32)
+    weights = np.uint64(1) << np.arange(band_bits, dtype=np.uint64)
+    bands = np.empty((vecs.shape[0], n_bands), dtype=np.uint64)
+    for s in range(0, vecs.shape[0], block_size):
+        bits = np.asarray(vecs[s:s + block_size], dtype=np.float32) @ planes > 0
+        bits = bits.reshape(len(bits), n_bands, band_bits).astype(np.uint64)
+        bands[s:s + block_size] = (bits * weights).sum(axis=2, dtype=np.uint64)
+    return bands
+
+
+def band_greedy_edges(
+    vecs: np.ndarray,
+    values: np.ndarray,
+    threshold: float,
+    select: Optional[np.ndarray] = None,
+    block_rows: int = 65536,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """밴드 값이 같은 행(버킷)끼리 순번대로 보며, 버킷 안에서 앞서 유지된 행과만 비교한다.
+
+    유지 행 중 유사도가 threshold 이상인 것이 있으면 그 간선들 (유지 행, 현재 행, 유사도) 을 내고,
+    없으면 현재 행을 버킷의 유지 행으로 추가한다. 비교 횟수는 버킷 크기 × 버킷 내 유지 행 수이므로
+    서로 가까운 큰 클러스터도 모든 쌍을 만들지 않는다. vecs 는 L2 정규화된 행(디스크 memmap 가능),
+    select 가 있으면 해당 행만 대상으로 한다.
+    """
+    idx = np.arange(len(values)) if select is None else np.flatnonzero(select)
+    # 안정 정렬이므로 버킷 안에서는 원래 순번 순서가 유지됨
+    order = idx[np.argsort(values[idx], kind="stable")]
+    vals = values[order]
+    starts = np.flatnonzero(np.r_[True, vals[1:] != vals[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    buckets = [order[s:s + n] for s, n in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist())]
+
+    out_i, out_j, out_sim = [], [], []
+    b = 0
+    while b < len(buckets):
+        # 여러 버킷의 행을 block_rows 개 정도씩 한 번에 읽음
+        block = [buckets[b]]
+        n_rows = len(buckets[b])
+        b += 1
+        while b < len(buckets) and n_rows + len(buckets[b]) <= block_rows:
+            block.append(buckets[b])
+            n_rows += len(buckets[b])
+            b += 1
+        rows_idx = np.sort(np.concatenate(block))
+        rows = np.asarray(vecs[rows_idx], dtype=np.float32)
+
+        for members in block:
+            m_rows = rows[np.searchsorted(rows_idx, members)]
+            kept = np.empty(len(members), dtype=np.int64)
+            kept_rows = np.empty_like(m_rows)
+            kept[0], kept_rows[0] = members[0], m_rows[0]
+            k = 1
+            for t in range(1, len(members)):
+                sims = kept_rows[:k] @ m_rows[t]
+                hit = sims >= threshold
+                if hit.any():
+                    out_i.extend(kept[:k][hit].tolist())
+                    out_j.extend([int(members[t])] * int(hit.sum()))
+                    out_sim.extend(sims[hit].tolist())
+                else:
+                    kept[k], kept_rows[k] = members[t], m_rows[t]
+                    k += 1
+    return (
+        np.array(out_i, dtype=np.int64),
+        np.array(out_j, dtype=np.int64),
+        np.array(out_sim, dtype=np.float32),
+    )
+
+
+class CodeStore:
+    """양자화 모드별 재채점용 벡터 저장소. 임베딩을 배치 단위로 받아 바로 변환한다.
+
+    - int8  : 메모리에 int8 코드 (N×D 바이트)
+    - binary: float32 정규화 벡터는 디스크 memmap, 메모리에는 이후 만드는 부호 비트만 (N×D/8 바이트)
+    """
+
+    def __init__(self, mode: str, n: int, cache_path: Path):
+        self.mode = mode
+        self.n = n
+        self.cache_path = cache_path
+        self.vecs: Optional[np.ndarray] = None
+
+    def add(self, offset: int, chunk: np.ndarray) -> None:
+        if self.vecs is None:
+            shape = (self.n, chunk.shape[1])
+            if self.mode == "int8":
+                self.vecs = np.empty(shape, dtype=np.int8)
+            else:
+                self.vecs = np.lib.format.open_memmap(
+                    self.cache_path, mode="w+", dtype=np.float32, shape=shape
+                )
+        if self.mode == "int8":
+            self.vecs[offset:offset + len(chunk)] = quantize_int8(chunk)
+        else:
+            self.vecs[offset:offset + len(chunk)] = l2_normalize(chunk)
+
+    @property
+    def dim(self) -> int:
+        return self.vecs.shape[1]
+
+    def close(self) -> None:
+        if self.mode == "binary" and self.vecs is not None:
+            self.vecs.flush()
+            self.vecs = None
+            self.cache_path.unlink(missing_ok=True)
@@ -1,7 +1,6 @@
 import logging
 from pathlib import Path
-import shutil
-import time
+import uuid
 from collections import defaultdict
 import pandas as pd
 import numpy as np
@@ -13,7 +12,9 @@ try:
 except ImportError:
     raise ImportError("Please install fiftyone, fiftyone-zoo, scikit-learn")
 
-from ..utils.progress import progress_bar
+from .embedding_quant import CodeStore, binarize, iter_hamming_candidates, rescore_pairs
+from ..utils.path_utils import copy_files
+from ..utils.resource_governor import ResourceGovernor, max_workers
 
 class ImageFiftyOne:
     def __init__(self, cfg):
@@ -26,6 +27,14 @@ class ImageFiftyOne:
         self.model_name = self.cfg.FIFTYONE_MODEL
         self.threshold = self.cfg.FIFTYONE_THRESHOLD
         self.batch_size = self.cfg.FIFTYONE_BATCH_SIZE
+        # 임베딩 양자화 설정
+        self.embedding_mode = self.cfg.FIFTYONE_EMBEDDING_MODE
+        if self.embedding_mode not in ("float32", "int8", "binary"):
+            raise ValueError(f"Unknown FIFTYONE_EMBEDDING_MODE: {self.embedding_mode}")
+        self.hamming_radius = self.cfg.FIFTYONE_HAMMING_RADIUS
+        self.block_size = self.cfg.FIFTYONE_BLOCK_SIZE
+        self.verify_quant = self.cfg.FIFTYONE_VERIFY_QUANT
+        self.embedding_cache_path = self.cfg.WORK_DIR / "image_embeddings.npy"
 
     def run(self):
         self.logger.info("Starting image deduplication...")
@@ -36,15 +45,18 @@ class ImageFiftyOne:
         # 1. FiftyOne으로 중복 탐지
         kept_paths, dup_map = self._find_duplicates()
         
-        # 2. 고유 파일 복사
+        # 2. 고유 파일 복사 및 리포트 저장
+        self.save_results(kept_paths, dup_map)
+
+    def save_results(self, kept_paths: set[str], dup_map: dict[str, str]) -> None:
         self.out_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info("Copying %d unique files to %s", len(kept_paths), self.out_dir)
-        with progress_bar(kept_paths, desc="Copying unique images") as pbar:
-            for p_str in pbar:
-                p = Path(p_str)
-                shutil.copy2(p, self.out_dir / p.name)
+        copy_files(
+            [Path(p) for p in sorted(kept_paths)], self.out_dir,
+            ResourceGovernor.from_config(self.cfg, "copy", self.cfg.COPY_WORKERS, maximum=max_workers(self.cfg)),
+            desc="Copying unique images",
+        )
 
-        # 3. 리포트 저장
         if dup_map:
             report_df = pd.DataFrame(
                 dup_map.items(), columns=["duplicate_file", "source_file"]
@@ -53,37 +65,153 @@ class ImageFiftyOne:
             self.logger.info("Image deduplication report saved to %s", self.report_path)
 
     def _find_duplicates(self) -> tuple[set[str], dict[str, str]]:
-        dataset_name = f"image-dedup-{int(time.time())}"
-        if fo.dataset_exists(dataset_name):
-            fo.delete_dataset(dataset_name)
+        if self.embedding_mode == "float32" or self.verify_quant:
+            # 일치도 검증에는 float32 기준 그룹핑이 필요하므로 전체 임베딩을 유지
+            str_image_paths, embeddings = self.embed_dir()
+            if not str_image_paths:
+                return set(), {}
+            return self.dedup_embeddings(str_image_paths, embeddings)
+
+        # 양자화 모드: 배치별 임베딩을 바로 코드로 변환해 float32 전체 배열을 만들지 않음
+        str_image_paths, store = self.embed_dir(quantize=True)
+        if not str_image_paths:
+            return set(), {}
+        try:
+            return self._collect(str_image_paths, self._quantized_pairs(store))
+        finally:
+            store.close()
+
+    def embed_dir(self, quantize: bool = False) -> tuple[list[str], np.ndarray | CodeStore | None]:
+        """in_dir 의 이미지 경로 목록과 그 순서에 맞춘 임베딩을 반환한다.
+
+        quantize 가 True 면 이미지 수를 안 뒤 CodeStore 를 만들어 배치별 임베딩을 바로 넣고,
+        임베딩 대신 그 store 를 반환한다. store 를 닫는 것은 호출 측 책임이다.
+        """
+        # 여러 노드/프로세스가 같은 FiftyOne DB 를 공유할 수 있으므로 이름이 겹치지 않게 하고,
+        # 이 프로세스가 만든 데이터셋만 삭제한다.
+        dataset_name = f"image-dedup-{uuid.uuid4().hex}"
 
         self.logger.info("Creating fiftyone dataset from directory %s...", self.in_dir)
         # 오류 수정을 위해 기존 코드 방식을 따라 from_images_dir 사용
         dataset = fo.Dataset.from_images_dir(str(self.in_dir), name=dataset_name, persistent=False)
+        try:
+            if not dataset:
+                self.logger.warning("Fiftyone was unable to find any valid images in %s.", self.in_dir)
+                return [], None
 
-        if not dataset:
-            self.logger.warning("Fiftyone was unable to find any valid images in %s.", self.in_dir)
-            return set(), {}
+            # Dataset 생성 후, fiftyone이 인식한 파일 경로 목록을 다시 가져와 순서를 보장
+            str_image_paths = [s.filepath for s in dataset]
+            store = (
+                CodeStore(self.embedding_mode, len(str_image_paths), self.embedding_cache_path)
+                if quantize else None
+            )
 
-        # Dataset 생성 후, fiftyone이 인식한 파일 경로 목록을 다시 가져와 순서를 보장
-        str_image_paths = [s.filepath for s in dataset]
-        
-        self.logger.info("Computing embeddings with '%s'...", self.model_name)
-        model = foz.load_zoo_model(self.model_name)
-        embeddings = dataset.compute_embeddings(model, batch_size=self.batch_size)
+            self.logger.info("Computing embeddings with '%s'...", self.model_name)
+            model = foz.load_zoo_model(self.model_name)
+
+            def _embed(idx):
+                emb = dataset.skip(idx.start).limit(len(idx)).compute_embeddings(
+                    model, batch_size=len(idx)
+                )
+                if store is None:
+                    return emb
+                store.add(idx.start, emb)
+
+            # FIFTYONE_BATCH_SIZE 에서 시작해 메모리/처리량을 보며 배치 크기를 조절
+            governor = ResourceGovernor.from_config(self.cfg, "fiftyone-embed", self.batch_size)
+            try:
+                chunks = governor.map_batches(range(len(str_image_paths)), _embed)
+            except BaseException:
+                if store is not None:
+                    store.close()
+                raise
+        finally:
+            dataset.delete()
+        return str_image_paths, (np.concatenate(chunks) if store is None else store)
+
+    def dedup_embeddings(
+        self, str_image_paths: list[str], embeddings: np.ndarray
+    ) -> tuple[set[str], dict[str, str]]:
+        if self.embedding_mode == "float32":
+            return self._collect(str_image_paths, self._float_pairs(embeddings))
+
+        store = CodeStore(self.embedding_mode, len(embeddings), self.embedding_cache_path)
+        try:
+            for s in range(0, len(embeddings), self.block_size):
+                store.add(s, embeddings[s:s + self.block_size])
+            pairs = self._quantized_pairs(store)
+        finally:
+            store.close()
+        ref_pairs = self._float_pairs(embeddings) if self.verify_quant else None
+        return self._collect(str_image_paths, pairs, ref_pairs)
+
+    def _collect(
+        self,
+        str_image_paths: list[str],
+        pairs: list[tuple[int, int]],
+        ref_pairs: list[tuple[int, int]] | None = None,
+    ) -> tuple[set[str], dict[str, str]]:
+        n = len(str_image_paths)
+        removable_indices, dup_map = self._group_pairs(pairs, n, str_image_paths)
+        if ref_pairs is not None:
+            _, ref_dup_map = self._group_pairs(ref_pairs, n, str_image_paths)
+            self._report_agreement(dup_map, ref_dup_map, n)
+
+        all_indices = set(range(n))
+        kept_indices = all_indices - removable_indices
+        kept_paths = {str_image_paths[i] for i in kept_indices}
         
+        self.logger.info(
+            "Found %d duplicates. Kept: %d, Removed: %d",
+            len(removable_indices), len(kept_paths), len(removable_indices)
+        )
+        return kept_paths, dup_map
+
+    def _float_pairs(self, embeddings: np.ndarray) -> list[tuple[int, int]]:
         self.logger.info("Calculating similarity matrix...")
         sim_matrix = cosine_similarity(embeddings)
         np.fill_diagonal(sim_matrix, -1.0) # 자기 자신과의 비교는 제외
 
         self.logger.info("Grouping duplicates with threshold %.2f...", self.threshold)
-        adj = defaultdict(set)
+        pairs = []
         n = embeddings.shape[0]
         for i in range(n):
             for j in range(i + 1, n):
                 if sim_matrix[i, j] > self.threshold:
-                    adj[i].add(j)
-                    adj[j].add(i)
+                    pairs.append((i, j))
+        return pairs
+
+    def _quantized_pairs(self, store: CodeStore) -> list[tuple[int, int]]:
+        """해밍 거리로 후보를 추리고 타일마다 바로 코사인 유사도로 재채점한다. (N×N 행렬 없음)
+
+        재채점은 store 의 벡터(int8 코드 또는 디스크 memmap 의 float32)로 수행하며,
+        임계값을 넘은 쌍만 누적하므로 후보 전체 목록은 메모리에 남지 않는다.
+        """
+        bits = binarize(store.vecs, self.block_size)
+        max_dist = int(self.hamming_radius * store.dim)
+        self.logger.info(
+            "Hamming prefilter (%s mode, %d bits, radius %d)...",
+            self.embedding_mode, store.dim, max_dist,
+        )
+
+        pairs = []
+        n_cand = 0
+        for ii, jj in iter_hamming_candidates(bits, max_dist, self.block_size):
+            n_cand += len(ii)
+            pairs.extend(rescore_pairs(store.vecs, ii, jj, self.threshold))
+        self.logger.info(
+            "Rescored %d candidate pairs with threshold %.2f: %d matches",
+            n_cand, self.threshold, len(pairs),
+        )
+        return pairs
+
+    def _group_pairs(
+        self, pairs: list[tuple[int, int]], n: int, str_image_paths: list[str]
+    ) -> tuple[set[int], dict[str, str]]:
+        adj = defaultdict(set)
+        for i, j in pairs:
+            adj[i].add(j)
+            adj[j].add(i)
 
         visited = set()
         duplicate_groups = []
@@ -104,7 +232,7 @@ class ImageFiftyOne:
 
         removable_indices = set()
         dup_map = {} # {제거될 파일: 원본 파일}
-        
+
         for group in duplicate_groups:
             # 그룹 내 첫번째 파일을 원본으로 간주
             source_idx = group[0]
@@ -113,15 +241,21 @@ class ImageFiftyOne:
                 removable_indices.add(dup_idx)
                 dup_path = str_image_paths[dup_idx]
                 dup_map[dup_path] = source_path
-        
-        all_indices = set(range(n))
-        kept_indices = all_indices - removable_indices
-        kept_paths = {str_image_paths[i] for i in kept_indices}
-        
+        return removable_indices, dup_map
+
+    def _report_agreement(self, dup_map: dict[str, str], ref_dup_map: dict[str, str], n: int) -> None:
+        """양자화 결과와 float32 기준 그룹핑의 일치도를 로깅한다."""
+        # 파일별 판정(유지 / 어떤 원본의 중복인지)이 같은 비율
+        mismatched = {
+            p for p in dup_map.keys() | ref_dup_map.keys()
+            if dup_map.get(p) != ref_dup_map.get(p)
+        }
+        agreement = 1.0 - len(mismatched) / n if n else 1.0
+        removed, ref_removed = set(dup_map), set(ref_dup_map)
+        precision = len(removed & ref_removed) / len(removed) if removed else 1.0
+        recall = len(removed & ref_removed) / len(ref_removed) if ref_removed else 1.0
         self.logger.info(
-            "Found %d duplicates. Kept: %d, Removed: %d",
-            len(removable_indices), len(kept_paths), len(removable_indices)
+            "Quantized (%s) vs float32 grouping: agreement=%.4f, "
+            "removed precision=%.4f, recall=%.4f (%d mismatched files)",
+            self.embedding_mode, agreement, precision, recall, len(mismatched),
         )
-        
-        dataset.delete()
-        return kept_paths, dup_map
\ No newline at end of file
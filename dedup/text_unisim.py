@@ -1,15 +1,75 @@
 import logging
 from pathlib import Path
+from typing import Iterable, Iterator
 import pandas as pd
-import shutil
 from itertools import chain
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+import zlib
+import multiprocessing as mp
+import numpy as np
 
 try:
     from unisim import TextSim
 except ImportError as e:
     raise RuntimeError("UniSim not installed. Please run 'pip install unisim'.") from e
 
+from ..utils.path_utils import copy_files
 from ..utils.progress import progress_bar
+from ..utils.resource_governor import ResourceGovernor, max_workers
+from ..utils.text_io import ENCODINGS, detect_encoding, iter_text_chunks, iter_windows, read_text_auto
+from .embedding_quant import band_greedy_edges, l2_normalize, simhash_bands
+
+
+# 워커 프로세스마다 한 번만 만드는 TextSim (풀 initializer 에서 생성)
+_WORKER_TS = None
+
+
+def _init_embed_worker() -> None:
+    global _WORKER_TS
+    _WORKER_TS = TextSim(store_data=False, index_type="exact", use_accelerator=True)
+
+
+def _embed_files(
+    ts: TextSim,
+    files: list[str],
+    probe_bytes: int,
+    mmap_threshold: int,
+    governor: ResourceGovernor,
+) -> tuple[list[int], np.ndarray | None]:
+    """files 를 배치 단위로 읽어 임베딩한다. (읽은 파일의 files 내 순번, 정규화된 임베딩) 을 반환."""
+    def _embed(batch):
+        ok, texts = [], []
+        for pos, path in batch:
+            text = read_text_auto(Path(path), probe_bytes, mmap_threshold)
+            if text is not None:
+                ok.append(pos)
+                texts.append(text)
+        if not texts:
+            return ok, None
+        return ok, np.asarray(ts.embed(texts), dtype=np.float32)
+
+    results = governor.map_batches(list(enumerate(files)), _embed)
+    ok = [pos for positions, _ in results for pos in positions]
+    embs = [e for _, e in results if e is not None]
+    return ok, l2_normalize(np.concatenate(embs)) if embs else None
+
+
+def _embed_files_worker(files, probe_bytes, mmap_threshold, governor):
+    return _embed_files(_WORKER_TS, files, probe_bytes, mmap_threshold, governor)
+
+
+def _band_edges(
+    vecs: np.ndarray | str, values: np.ndarray, part: int, n_parts: int, threshold: float
+) -> tuple[np.ndarray, ...]:
+    """워커 작업: 밴드 하나의 버킷 중 part 번째 몫을 버킷별 탐욕 비교로 검증해 간선을 반환한다.
+
+    vecs 가 경로면 디스크의 임베딩을 memmap 으로 열어 필요한 행만 읽는다.
+    """
+    if isinstance(vecs, str):
+        vecs = np.load(vecs, mmap_mode="r")
+    select = None if n_parts == 1 else values % np.uint64(n_parts) == np.uint64(part)
+    return band_greedy_edges(vecs, values, threshold, select)
 
 
 class TextUnisim:
@@ -19,6 +79,33 @@ class TextUnisim:
         self.in_dir = self.cfg.TEXT_TEMP_DIR
         self.out_dir = self.cfg.TEXT_DEDUP_DIR
         self.report_path = self.cfg.WORK_DIR / "text_dedup_report.csv"
+        # 스트리밍 로딩 설정
+        self.probe_bytes = self.cfg.TEXT_ENCODING_PROBE_BYTES
+        self.mmap_threshold = self.cfg.TEXT_MMAP_THRESHOLD
+        self.chunk_bytes = self.cfg.TEXT_READ_CHUNK_BYTES
+        # 장문 윈도우 모드 설정
+        self.window_mode = self.cfg.TEXT_WINDOW_MODE
+        self.window_chars = self.cfg.TEXT_WINDOW_CHARS
+        self.window_overlap = self.cfg.TEXT_WINDOW_OVERLAP
+        self.window_sample_rate = self.cfg.TEXT_WINDOW_SAMPLE_RATE
+        self.window_governor = ResourceGovernor.from_config(
+            self.cfg, "text-window", self.cfg.TEXT_WINDOW_BATCH_SIZE
+        )
+        self.window_coverage = self.cfg.TEXT_WINDOW_COVERAGE
+        self.window_threshold = self.cfg.TEXT_WINDOW_THRESHOLD
+        if not 0 <= self.window_overlap < self.window_chars:
+            raise ValueError("TEXT_WINDOW_OVERLAP must be in [0, TEXT_WINDOW_CHARS).")
+        # 멀티프로세스 샤딩 설정
+        self.num_workers = self.cfg.TEXT_NUM_WORKERS
+        self.embed_governor = ResourceGovernor.from_config(
+            self.cfg, "text-embed", self.cfg.TEXT_EMBED_BATCH_SIZE
+        )
+        self.lsh_bands = self.cfg.TEXT_LSH_BANDS
+        self.lsh_band_bits = self.cfg.TEXT_LSH_BAND_BITS
+        self.lsh_seed = self.cfg.TEXT_LSH_SEED
+        self.embedding_cache_path = self.cfg.WORK_DIR / "text_embeddings.npy"
+        if self.window_mode and self.num_workers > 1:
+            self.logger.warning("Sharded text dedup is not supported in window mode; running sequentially.")
 
     def run(self):
         self.logger.info("Starting text deduplication...")
@@ -27,29 +114,45 @@ class TextUnisim:
             self.logger.warning("No text files found to deduplicate.")
             return
 
-        # 1. 텍스트 로딩
-        records = self._load_texts(files)
-        if not records:
-            self.logger.error("No text files could be read. Aborting.")
-            return
-        df = pd.DataFrame(records)
+        # 1. 텍스트 로딩 (지연 로딩: 중복 판별 단계에서 한 문서씩 읽음)
+        records = self._iter_texts(files)
 
         # 2. 중복 판별
-        kept_paths, dup_map = self._deduplicate(df)
+        oversized = self._oversized(files)
+        if oversized and not self.window_mode:
+            # 문서 단위 판별은 문서 전체를 문자열 하나로 디코딩하므로, 큰 파일이 있으면
+            # 청크 스트리밍으로 읽는 윈도우 모드로 전체 코퍼스를 처리
+            self.logger.warning(
+                f"{len(oversized)} files exceed TEXT_MMAP_THRESHOLD ({self.mmap_threshold} bytes), "
+                f"e.g. {oversized[0].name}; deduplicating in window mode so they are streamed."
+            )
+        if self.window_mode or oversized:
+            kept_paths, dup_map = self._deduplicate_windowed(files)
+        elif self.num_workers > 1:
+            kept_paths, dup_map = self._deduplicate_sharded(files)
+        else:
+            kept_paths, dup_map = self._deduplicate(records, total=len(files))
+        if not kept_paths:
+            self.logger.error("No text files could be read. Aborting.")
+            return
         dup_paths = set(dup_map.keys())
         all_paths = {str(f) for f in files}
         
         # 경로가 아닌 파일 이름만 로깅
         self.logger.info(f"Total: {len(all_paths)}, Kept: {len(kept_paths)}, Duplicates: {len(dup_paths)}")
 
-        # 3. 고유 파일 복사
+        # 3. 고유 파일 복사 및 리포트 저장
+        self.save_results(kept_paths, dup_map)
+
+    def save_results(self, kept_paths: set[str], dup_map: dict[str, str]) -> None:
         self.out_dir.mkdir(parents=True, exist_ok=True)
-        with progress_bar(kept_paths, desc="Copying unique files") as pbar:
-            for p_str in pbar:
-                shutil.copy2(p_str, self.out_dir / Path(p_str).name)
+        copy_files(
+            [Path(p) for p in sorted(kept_paths)], self.out_dir,
+            ResourceGovernor.from_config(self.cfg, "copy", self.cfg.COPY_WORKERS, maximum=max_workers(self.cfg)),
+            desc="Copying unique files",
+        )
         self.logger.info(f"Copied {len(kept_paths)} unique files to {self.out_dir}")
 
-        # 4. 리포트 저장
         if dup_map:
             report_df = pd.DataFrame(
                 dup_map.items(), columns=["duplicate_file", "source_file"]
@@ -57,25 +160,18 @@ class TextUnisim:
             report_df.to_csv(self.report_path, index=False, encoding="utf-8-sig")
             self.logger.info(f"Deduplication report saved to {self.report_path}")
 
-    def _load_texts(self, files: list[Path]) -> list[dict]:
-        records = []
-        with progress_bar(files, desc="Loading texts") as pbar:
-            for p in pbar:
-                text = None
-                for enc in ("utf-8", "cp949", "euc-kr"):
-                    try:
-                        text = p.read_text(encoding=enc)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                if text is None:
-                    self.logger.warning(f"Encoding issue, skipping: {p.name}")
-                    continue
-                records.append({"path": str(p), "text": text})
-        return records
+    def _iter_texts(self, files: list[Path]) -> Iterator[dict]:
+        """인코딩을 앞부분으로 한 번만 판별하고, 문서를 하나씩 지연 반환한다."""
+        for p in files:
+            text = read_text_auto(p, self.probe_bytes, self.mmap_threshold)
+            if text is None:
+                self.logger.warning(f"Encoding issue, skipping: {p.name}")
+                continue
+            yield {"path": str(p), "text": text}
 
-    def _deduplicate(self, df: pd.DataFrame) -> tuple[set[str], dict[str, str]]:
-        ts = TextSim(store_data=True, index_type="exact", use_accelerator=True)
+    def _deduplicate(self, records: Iterable[dict], total: int) -> tuple[set[str], dict[str, str]]:
+        # 원문은 저장하지 않음 (매칭 인덱스만 사용하므로 메모리가 코퍼스 크기에 비례하지 않도록)
+        ts = TextSim(store_data=False, index_type="exact", use_accelerator=True)
         
         kept_paths = set()
         # {중복 파일: 원본 파일} 맵
@@ -84,8 +180,8 @@ class TextUnisim:
         # UniSim은 ID를 저장하지 않으므로, 추가된 텍스트의 인덱스와 파일 경로를 매핑
         indexed_paths = []
 
-        with progress_bar(df.iterrows(), desc="Finding duplicates", total=len(df)) as pbar:
-            for _, row in pbar:
+        with progress_bar(records, desc="Finding duplicates", total=total) as pbar:
+            for row in pbar:
                 path = row["path"]
                 text = str(row["text"])
 
@@ -110,3 +206,283 @@ class TextUnisim:
                     dup_map[path] = source_path
         
         return kept_paths, dup_map
+
+    def _iter_doc_windows(self, p: Path, encoding: str) -> Iterator[str]:
+        """문서를 스트리밍으로 읽어 내용 기반 윈도우를 반환한다.
+
+        window_sample_rate 가 1 보다 크면 윈도우 내용 해시가 그 값으로 나눠떨어지는 윈도우만 남긴다.
+        모든 문서에 같은 기준을 쓰므로 같은 구간을 공유하는 문서끼리는 문서 길이와 무관하게
+        같은 윈도우가 남는다. 하나도 남지 않는 짧은 문서는 첫 윈도우를 사용한다.
+        """
+        windows = iter_windows(
+            iter_text_chunks(p, encoding, self.mmap_threshold, self.chunk_bytes),
+            self.window_chars, self.window_overlap,
+        )
+        if self.window_sample_rate <= 1:
+            yield from windows
+            return
+        first, n_kept = None, 0
+        for w in windows:
+            if first is None:
+                first = w
+            if zlib.crc32(w.encode("utf-8", "surrogatepass")) % self.window_sample_rate == 0:
+                n_kept += 1
+                yield w
+        if not n_kept and first is not None:
+            yield first
+
+    def _iter_window_batches(self, p: Path, encoding: str) -> Iterator[list[str]]:
+        batch = []
+        for w in self._iter_doc_windows(p, encoding):
+            batch.append(w)
+            if len(batch) >= self.window_governor.size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _match_windows(self, ts: TextSim, p: Path, encoding: str, window_owners: list[str]) -> tuple[Counter, int]:
+        """문서의 윈도우를 배치 단위로 검색해 (기존 문서별 매칭 윈도우 수, 전체 윈도우 수) 를 반환한다."""
+        hits, n_windows = Counter(), 0
+        for batch in self._iter_window_batches(p, encoding):
+            n_windows += len(batch)
+            if not window_owners:
+                continue
+            collections = self.window_governor.map_batches(
+                batch, lambda b: ts.search(b, similarity_threshold=self.window_threshold, k=1)
+            )
+            for res in collections:
+                for r in res.results:
+                    if r.num_matches > 0:
+                        hits[window_owners[r.matches[0].idx]] += 1
+        return hits, n_windows
+
+    def _deduplicate_windowed(self, files: list[Path]) -> tuple[set[str], dict[str, str]]:
+        """장문 모드: 윈도우 단위로 임베딩하고, 윈도우 매칭 커버리지로 문서 중복을 판정한다.
+
+        문서의 윈도우 중 window_coverage 이상이 같은 기존 문서의 윈도우와 매칭되면
+        그 문서의 중복으로 본다. 커버리지를 낮추면 일부 장(chapter)만 공유하는 문서도 잡힌다.
+        문서는 두 번 스트리밍한다: 검색으로 커버리지를 구하고, 유지될 때만 다시 읽어 인덱스에 추가.
+        """
+        ts = TextSim(store_data=False, index_type="exact", use_accelerator=True)
+
+        kept_paths = set()
+        dup_map = {}
+        # 인덱스에 추가된 윈도우 번호 → 해당 윈도우가 속한 원본 파일 경로
+        window_owners = []
+
+        with progress_bar(files, desc="Finding duplicates (windowed)") as pbar:
+            for p in pbar:
+                path = str(p)
+                enc = detect_encoding(p, self.probe_bytes)
+                matched = None
+                if enc is not None:
+                    # 앞부분 이후에서 디코딩이 실패하면 나머지 후보 인코딩으로 재시도
+                    for cand in ENCODINGS[ENCODINGS.index(enc):]:
+                        try:
+                            matched = self._match_windows(ts, p, cand, window_owners)
+                            enc = cand
+                            break
+                        except UnicodeDecodeError:
+                            continue
+                if matched is None:
+                    self.logger.warning(f"Encoding issue, skipping: {p.name}")
+                    continue
+
+                hits, n_windows = matched
+                if hits:
+                    source_path, n_hit = hits.most_common(1)[0]
+                    coverage = n_hit / n_windows
+                    if coverage >= self.window_coverage:
+                        self.logger.debug(
+                            f"{p.name} duplicates {Path(source_path).name} (coverage {coverage:.2f})"
+                        )
+                        dup_map[path] = source_path
+                        continue
+
+                # 인덱스 추가는 재시도하지 않으므로 현재 배치 크기로만 분할
+                for batch in self._iter_window_batches(p, enc):
+                    ts.add(batch)
+                    window_owners.extend([path] * len(batch))
+                kept_paths.add(path)
+
+        return kept_paths, dup_map
+
+    def _deduplicate_sharded(self, files: list[Path]) -> tuple[set[str], dict[str, str]]:
+        """파일을 연속 구간으로 나눠 워커 프로세스에서 읽기/임베딩한 뒤, 같은 풀에서 LSH 밴드별로 중복 판별한다.
+
+        각 파일은 워커에서 한 번만 읽으며, 부모 프로세스는 결과 임베딩만 전역 순서로 모은다.
+        """
+        names = [str(p) for p in files]
+        n_chunks = min(len(names), self.num_workers * 4)
+        bounds = np.linspace(0, len(names), n_chunks + 1).astype(int)
+        chunks = [names[bounds[k]:bounds[k + 1]] for k in range(n_chunks)]
+        # 워커마다 RSS 예산을 나눠 가짐
+        governor = self.embed_governor.share(self.num_workers)
+        ctx = mp.get_context("spawn")
+        paths, embs = [], []
+        with ProcessPoolExecutor(
+            max_workers=self.num_workers, mp_context=ctx, initializer=_init_embed_worker
+        ) as ex:
+            futures = [
+                ex.submit(_embed_files_worker, chunk, self.probe_bytes, self.mmap_threshold, governor)
+                for chunk in chunks
+            ]
+            with progress_bar(None, desc="Embedding texts", total=len(names)) as pbar:
+                for chunk, fut in zip(chunks, futures):
+                    ok, emb = fut.result()
+                    for pos in sorted(set(range(len(chunk))) - set(ok)):
+                        self.logger.warning(f"Encoding issue, skipping: {Path(chunk[pos]).name}")
+                    paths += [chunk[pos] for pos in ok]
+                    if emb is not None:
+                        embs.append(emb)
+                    pbar.update(len(chunk))
+            if not paths:
+                return set(), {}
+            return self.dedup_embeddings(paths, np.concatenate(embs), executor=ex)
+
+    def _oversized(self, files: list[Path]) -> list[Path]:
+        """문서 단위 판별에서 통째로 디코딩하면 안 되는(TEXT_MMAP_THRESHOLD 이상) 파일 목록."""
+        return [p for p in files if p.stat().st_size >= self.mmap_threshold]
+
+    def embed_shard(self) -> tuple[list[str], np.ndarray | None]:
+        """in_dir 의 텍스트를 현재 프로세스에서 임베딩한다. 분산 모드의 노드가 사용한다.
+
+        중복 판별은 하지 않으며, 리듀서가 모든 샤드의 임베딩으로 전역 판별한다.
+        리듀서는 문서 단위로만 비교하므로 TEXT_MMAP_THRESHOLD 이상의 파일은 거부한다.
+        """
+        paths = sorted(self.in_dir.glob("*.txt"))
+        oversized = self._oversized(paths)
+        if oversized:
+            raise ValueError(
+                f"{len(oversized)} text files exceed TEXT_MMAP_THRESHOLD ({self.mmap_threshold} bytes), "
+                f"e.g. {oversized[0].name}. Distributed mode embeds whole documents; "
+                f"raise the threshold or deduplicate these files in single-node window mode."
+            )
+        files = [str(p) for p in paths]
+        if not files:
+            return [], None
+        ts = TextSim(store_data=False, index_type="exact", use_accelerator=True)
+        ok, emb = _embed_files(ts, files, self.probe_bytes, self.mmap_threshold, self.embed_governor)
+        for pos in sorted(set(range(len(files))) - set(ok)):
+            self.logger.warning(f"Encoding issue, skipping: {Path(files[pos]).name}")
+        return [files[pos] for pos in ok], emb
+
+    def dedup_embeddings(
+        self, paths: list[str], emb: np.ndarray, executor: Executor | None = None
+    ) -> tuple[set[str], dict[str, str]]:
+        """임베딩으로 순차 모드와 같은 규칙의 중복 판별을 근사적으로 수행한다.
+
+        paths 순서대로 보며, 앞서 유지된 문서 중 유사도가 threshold 이상인 것이 있으면 중복이고
+        원본은 그중 유사도가 가장 높은 문서(동률이면 앞 문서)다. 다만 비교 대상을 SimHash 밴드 버킷으로
+        한정하므로 순차 모드와 결과가 완전히 같다는 보장은 없다.
+        - 어떤 밴드도 겹치지 않는 쌍은 비교하지 않는다 (TEXT_LSH_* 참고).
+        - 버킷 안에서는 버킷의 유지 문서와만 비교하므로, 버킷에서는 탈락했지만 전역에서는 유지되는
+          문서와의 간선이 빠질 수 있다.
+
+        1. 임베딩이 완전히 같은 문서는 첫 문서(대표)로 묶는다.
+        2. 대표들의 밴드마다, 버킷을 n_parts 몫으로 나눈 (밴드, 몫) 작업을 executor 에 분배한다.
+           각 작업은 버킷을 순번대로 훑으며 버킷의 유지 문서와만 비교해 간선을 낸다.
+        3. 검증된 간선을 전역 순서대로 한 번 훑어 유지/중복과 원본을 정한다 (_resolve).
+        """
+        threshold = self.cfg.UNISIM_THRESHOLD
+        emb = np.ascontiguousarray(emb, dtype=np.float32)
+        _, rep_pos, group = np.unique(
+            emb.view(np.dtype((np.void, emb.dtype.itemsize * emb.shape[1]))).ravel(),
+            return_index=True, return_inverse=True,
+        )
+        group = group.ravel()
+        # 대표는 원래 순서대로 정렬 (대표 순번 = 문서 순번의 단조 증가 함수)
+        order = np.argsort(rep_pos)
+        reps = rep_pos[order]
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        rep_of = rank[group]  # 문서 → 대표 순번
+        rep_emb = emb[reps]
+
+        bands = simhash_bands(rep_emb, self.lsh_bands, self.lsh_band_bits, self.lsh_seed)
+        own_pool = executor is None and self.num_workers > 1
+        if own_pool:
+            executor = ProcessPoolExecutor(max_workers=self.num_workers, mp_context=mp.get_context("spawn"))
+        try:
+            if executor is None:
+                edges = [_band_edges(rep_emb, bands[:, b], 0, 1, threshold) for b in range(bands.shape[1])]
+            else:
+                # 워커는 디스크의 임베딩을 memmap 으로 공유하고, 작업 수가 워커 수의 2배 이상이 되도록 밴드를 나눔
+                n_parts = max(1, -(-2 * self.num_workers // bands.shape[1]))
+                np.save(self.embedding_cache_path, rep_emb)
+                futures = [
+                    executor.submit(
+                        _band_edges, str(self.embedding_cache_path), bands[:, b], part, n_parts, threshold
+                    )
+                    for b in range(bands.shape[1])
+                    for part in range(n_parts)
+                ]
+                edges = [fut.result() for fut in futures]
+        finally:
+            if own_pool:
+                executor.shutdown()
+            self.embedding_cache_path.unlink(missing_ok=True)
+        self.logger.info(
+            f"Verified {sum(len(e[0]) for e in edges)} candidate edges over {bands.shape[1]} LSH bands"
+        )
+
+        src, nbr_a, nbr_b, nbr_sim = self._resolve(len(reps), edges)
+
+        kept_paths = set()
+        dup_map = {}
+        for i, path in enumerate(paths):
+            r = rep_of[i]
+            if reps[r] == i:
+                if src[r] < 0:
+                    kept_paths.add(path)
+                else:
+                    dup_map[path] = paths[reps[src[r]]]
+            elif src[r] < 0:
+                # 대표가 유지되었다면 유사도 1 인 대표가 원본
+                dup_map[path] = paths[reps[r]]
+            else:
+                # 대표가 중복이면, 대표의 이웃 중 i 보다 앞서 유지된 문서가 원본 후보
+                lo, hi = np.searchsorted(nbr_a, [r, r + 1])
+                cand = nbr_b[lo:hi]
+                mask = (src[cand] < 0) & (reps[cand] < i)
+                cand, sims = cand[mask], nbr_sim[lo:hi][mask]
+                best = cand[np.lexsort((cand, -sims))[0]]
+                dup_map[path] = paths[reps[best]]
+
+        return kept_paths, dup_map
+
+    @staticmethod
+    def _resolve(n: int, edges: list[tuple[np.ndarray, ...]]) -> tuple[np.ndarray, ...]:
+        """간선 (i, j, sim), i < j 로 순차 판정을 재현한다.
+
+        src[j] 는 j 가 중복이면 원본 대표 순번, 유지면 -1. 양방향 이웃 목록(nbr_a 기준 정렬)도 함께 반환한다.
+        """
+        if edges:
+            ii = np.concatenate([e[0] for e in edges]).astype(np.int64)
+            jj = np.concatenate([e[1] for e in edges]).astype(np.int64)
+            sims = np.concatenate([e[2] for e in edges]).astype(np.float32)
+        else:
+            ii = jj = np.empty(0, dtype=np.int64)
+            sims = np.empty(0, dtype=np.float32)
+        lo_, hi_ = np.minimum(ii, jj), np.maximum(ii, jj)
+
+        src = np.full(n, -1, dtype=np.int64)
+        # 뒤 문서 기준으로 정렬: 같은 뒤 문서 안에서는 유사도 내림차순, 동률이면 앞 문서 우선
+        order = np.lexsort((lo_, -sims, hi_))
+        lo_s, hi_s = lo_[order], hi_[order]
+        starts = np.flatnonzero(np.r_[True, hi_s[1:] != hi_s[:-1]]) if len(order) else []
+        ends = np.r_[starts[1:], len(order)] if len(order) else []
+        for s, e in zip(starts, ends):
+            j = hi_s[s]
+            for i in lo_s[s:e]:
+                # i < j 이므로 i 의 판정은 이미 끝남
+                if src[i] < 0:
+                    src[j] = i
+                    break
+
+        nbr_a = np.concatenate([lo_, hi_])
+        nbr_b = np.concatenate([hi_, lo_])
+        nbr_sim = np.concatenate([sims, sims])
+        order = np.argsort(nbr_a, kind="stable")
+        return src, nbr_a[order], nbr_b[order], nbr_sim[order]
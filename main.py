@@ -12,22 +12,53 @@ from .core.dispatcher import Dispatcher
 from .postproc.image_cleaner import ImageCleaner
 from .dedup.text_unisim import TextUnisim
 from .dedup.image_fiftyone import ImageFiftyOne
+from .core.distributed import DistributedRunner, default_node_id
 from .utils.path_utils import cleanup_temp_dirs
 
 
 def parse_args():
     p = argparse.ArgumentParser()
-    p.add_argument("input_dir", type=Path, help="원본 디렉터리")
-    return p.parse_args()
+    p.add_argument("input_dir", type=Path, nargs="?", help="원본 디렉터리")
+    p.add_argument(
+        "--role", choices=["single", "plan", "worker", "reduce", "local"], default="single",
+        help="single: 단일 프로세스 실행 / plan, worker, reduce: 분산 모드 단계 / "
+             "local: 로컬 프로세스 여러 개로 분산 모드 실행",
+    )
+    p.add_argument("--queue-dir", type=Path, help="분산 모드 공유 작업 큐 디렉터리")
+    p.add_argument("--node-id", default=None, help="worker 노드 ID (기본: 호스트명-PID)")
+    p.add_argument("--num-nodes", type=int, default=2, help="local 모드에서 띄울 노드 프로세스 수")
+    args = p.parse_args()
+    if args.role in ("single", "plan", "local") and args.input_dir is None:
+        p.error(f"input_dir is required for role '{args.role}'")
+    return args
+
+
+def run_distributed(args, cfg: Config, logger: logging.Logger) -> None:
+    runner = DistributedRunner(cfg)
+    if args.role == "plan":
+        runner.plan(args.input_dir)
+    elif args.role == "worker":
+        runner.work(args.node_id or default_node_id())
+    elif args.role == "reduce":
+        runner.reduce()
+    else:
+        runner.run_local(args.input_dir, args.num_nodes)
+    logger.info("Distributed role '%s' finished.", args.role)
 
 
 def main():
     args = parse_args()
     cfg = Config()
+    if args.queue_dir is not None:
+        cfg.DIST_QUEUE_DIR = args.queue_dir
     ensure_dirs(cfg)
     setup_logging(cfg)
     logger = logging.getLogger("MAIN")
 
+    if args.role != "single":
+        run_distributed(args, cfg, logger)
+        return
+
     logger.info("=== Stage 1: Dispatch ===")
     Dispatcher(cfg).run(args.input_dir)
 
@@ -2,12 +2,14 @@ from pathlib import Path
 import logging
 from typing import Dict
 from datetime import datetime
+from itertools import chain
 import shutil
 
 from .minicpm_wrapper import MiniCPMWrapper
 from .mineru_wrapper import MinerUWrapper
-from ..utils.path_utils import safe_move
+from ..utils.path_utils import copy_files, safe_move
 from ..utils.progress import progress_bar
+from ..utils.resource_governor import ResourceGovernor, max_workers
 
 
 class ImageCleaner:
@@ -16,14 +18,20 @@ class ImageCleaner:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.minicpm = MiniCPMWrapper(cfg)
         self.mineru = MinerUWrapper(cfg)
+        # 분류 배치 크기는 패스 간에 학습된 값을 유지
+        self.classify_governor = ResourceGovernor.from_config(
+            cfg, "minicpm", cfg.MINICPM_BATCH_SIZE
+        )
 
     def _run_minicpm(self, dir_path: Path) -> Dict[Path, str]:
-        preds = {}
-        with progress_bar(list(dir_path.glob("*")), desc="MiniCPM") as pbar:
-            for img in pbar:
-                label = self.minicpm.predict(img)
-                preds[img] = label
-        return preds
+        files = list(dir_path.glob("*"))
+        with progress_bar(None, desc="MiniCPM", total=len(files)) as pbar:
+            def _classify(batch):
+                labels = self.minicpm.predict_batch(batch)
+                pbar.update(len(batch))
+                return labels
+            labels = self.classify_governor.map_batches(files, _classify)
+        return dict(zip(files, chain.from_iterable(labels)))
 
     def _move(self, files, dst_dir):
         for f in files:
@@ -55,9 +63,11 @@ class ImageCleaner:
         output_dir.mkdir()
 
         # 2. mixed 파일들을 임시 입력 디렉토리로 복사
-        with progress_bar(files_to_parse, desc="Copying mixed files for MinerU") as pbar:
-            for f in pbar:
-                shutil.copy(f, in_dir / f.name)
+        copy_files(
+            files_to_parse, in_dir,
+            ResourceGovernor.from_config(self.cfg, "copy", self.cfg.COPY_WORKERS, maximum=max_workers(self.cfg)),
+            desc="Copying mixed files for MinerU",
+        )
 
         # 3. 디렉토리 단위로 MinerU 실행 및 결과 수집
         all_subs = self.mineru.parse_dir(in_dir, output_dir)
@@ -4,8 +4,13 @@ import torch
 from PIL import Image
 from transformers import AutoModel, AutoTokenizer
 
+from ..utils.resource_governor import is_oom
+
 
 class MiniCPMWrapper:
+    # 모델이 'pure' 또는 'mixed'로 확실하게 답변하도록 유도하는 프롬프트
+    QUESTION = "Does this image contain any text? Answer with only one word: 'pure' or 'mixed'."
+
     def __init__(self, cfg):
         self.cfg = cfg
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -45,9 +50,7 @@ class MiniCPMWrapper:
             
         try:
             image = Image.open(image_path).convert('RGB')
-            # 모델이 'pure' 또는 'mixed'로 확실하게 답변하도록 유도하는 프롬프트
-            question = "Does this image contain any text? Answer with only one word: 'pure' or 'mixed'."
-            msgs = [{'role': 'user', 'content': [image, question]}]
+            msgs = [{'role': 'user', 'content': [image, self.QUESTION]}]
 
             # 모델 추론
             res = self.model.chat(
@@ -56,13 +59,39 @@ class MiniCPMWrapper:
                 tokenizer=self.tokenizer
             )
             
-            # 결과 파싱
-            answer = res.lower()
-            if "pure" in answer:
-                return "pure"
-            else:
-                return "mixed"
+            return self._parse_answer(res)
 
         except Exception as e:
             self.logger.error("MiniCPM prediction failed for %s: %s", image_path, e)
-            return "mixed" # 에러 발생 시 안전하게 'mixed'로 처리
\ No newline at end of file
+            return "mixed" # 에러 발생 시 안전하게 'mixed'로 처리
+
+    def predict_batch(self, image_paths: list[Path]) -> list[str]:
+        """여러 이미지를 한 번의 배치 추론으로 분류한다.
+
+        OOM 은 호출자(리소스 거버너)가 배치를 줄일 수 있도록 그대로 올리고,
+        그 밖의 오류는 이미지별 predict 로 폴백한다.
+        """
+        if not self.model or len(image_paths) == 1:
+            return [self.predict(p) for p in image_paths]
+
+        try:
+            images = [Image.open(p).convert('RGB') for p in image_paths]
+            msgs = [[{'role': 'user', 'content': [img, self.QUESTION]}] for img in images]
+            # msgs 가 대화 목록의 리스트이면 MiniCPM-V 는 배치 추론을 수행하고 답변 리스트를 반환
+            res = self.model.chat(image=None, msgs=msgs, tokenizer=self.tokenizer)
+            return [self._parse_answer(a) for a in res]
+        except Exception as e:
+            if is_oom(e):
+                torch.cuda.empty_cache()
+                raise
+            self.logger.warning("Batched MiniCPM inference failed (%s); falling back to per-image.", e)
+            return [self.predict(p) for p in image_paths]
+
+    @staticmethod
+    def _parse_answer(res: str) -> str:
+        # 결과 파싱
+        answer = res.lower()
+        if "pure" in answer:
+            return "pure"
+        else:
+            return "mixed"
\ No newline at end of file
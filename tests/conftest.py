@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 패키지 밖에서도 의존성이 적은 모듈(core.work_queue, utils.* 등)을 바로 임포트할 수 있도록 저장소 루트를 추가
+sys.path.insert(0, str(ROOT))
+
+# 상대 임포트를 쓰는 모듈은 체크아웃 디렉터리 이름과 무관하게 dedup_agent 패키지로 임포트.
+# sys.path 로 찾을 수 있어야 spawn 으로 띄운 워커 프로세스에서도 같은 이름으로 임포트된다.
+if ROOT.name == "dedup_agent":
+    sys.path.insert(0, str(ROOT.parent))
+else:
+    _link_dir = Path(tempfile.mkdtemp(prefix="dedup_agent_"))
+    os.symlink(ROOT, _link_dir / "dedup_agent", target_is_directory=True)
+    sys.path.insert(0, str(_link_dir))
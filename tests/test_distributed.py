@@ -0,0 +1,136 @@
+import shutil
+import zlib
+
+import numpy as np
+import pytest
+
+# 단계(Dispatcher, ImageCleaner, 중복 판별)는 스텁으로 바꾸지만 모듈 임포트에는 의존성이 필요
+for _mod in ("pandas", "unisim", "fiftyone", "sklearn", "torch", "transformers", "PIL", "pymupdf"):
+    pytest.importorskip(_mod)
+
+from dedup_agent.config import Config, with_work_dir
+from dedup_agent.core import distributed
+from dedup_agent.core.distributed import DistributedRunner
+
+
+class StubDispatcher:
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+    def dispatch(self, files):
+        for f in files:
+            if f.name.startswith("poison"):
+                raise ValueError(f"cannot parse {f.name}")
+            shutil.copy2(f, self.cfg.TEXT_TEMP_DIR / f.name)
+
+
+class StubCleaner:
+    def __init__(self, cfg):
+        pass
+
+    def run(self, in_dir):
+        pass
+
+
+class StubText:
+    saved = []
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+    def embed_shard(self):
+        paths = sorted(self.cfg.TEXT_TEMP_DIR.glob("*.txt"))
+        if not paths:
+            return [], None
+        emb = np.array([[zlib.crc32(p.read_bytes()), 1.0] for p in paths], dtype=np.float32)
+        return [str(p) for p in paths], emb
+
+    def dedup_embeddings(self, paths, emb):
+        # 임베딩이 같으면 중복 (먼저 나온 문서가 원본)
+        first, kept, dup_map = {}, set(), {}
+        for path, row in zip(paths, map(tuple, emb)):
+            if row in first:
+                dup_map[path] = first[row]
+            else:
+                first[row] = path
+                kept.add(path)
+        return kept, dup_map
+
+    def save_results(self, kept, dup_map):
+        self.saved.append((kept, dup_map))
+
+
+class StubImage:
+    def __init__(self, cfg):
+        pass
+
+    def embed_dir(self):
+        return [], None
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    for name, stub in [
+        ("Dispatcher", StubDispatcher), ("ImageCleaner", StubCleaner),
+        ("TextUnisim", StubText), ("ImageFiftyOne", StubImage),
+    ]:
+        monkeypatch.setattr(distributed, name, stub)
+    monkeypatch.setattr(distributed, "setup_logging", lambda cfg: None)
+    monkeypatch.setattr(StubText, "saved", [])
+
+    cfg = with_work_dir(Config(), tmp_path / "work")
+    cfg.DIST_QUEUE_DIR = tmp_path / "queue"
+    cfg.DIST_SHARD_SIZE = 1
+    cfg.DIST_POLL_INTERVAL = 0.01
+    cfg.DIST_MAX_ATTEMPTS = 2
+    return DistributedRunner(cfg)
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    d = tmp_path / "input"
+    d.mkdir()
+    (d / "a.txt").write_text("같은 문서")
+    (d / "b.txt").write_text("같은 문서")
+    (d / "c.txt").write_text("다른 문서")
+    return d
+
+
+def names(paths):
+    return {p.rsplit("/", 1)[-1] for p in paths}
+
+
+def test_plan_work_reduce_round_trip(runner, input_dir):
+    assert len(runner.plan(input_dir)) == 3
+    runner.work("n1")
+    assert runner.queue.finished() and not runner.queue.failed_shards()
+    runner.reduce(wait=False)
+
+    ((kept, dup_map),) = StubText.saved
+    assert names(kept) == {"a.txt", "c.txt"}
+    assert {k.rsplit("/", 1)[-1]: v.rsplit("/", 1)[-1] for k, v in dup_map.items()} == {"b.txt": "a.txt"}
+
+
+def test_poison_shard_fails_loudly(runner, input_dir):
+    (input_dir / "poison.txt").write_text("깨진 문서")
+    runner.plan(input_dir)
+    # 실패한 샤드가 있어도 노드는 나머지 샤드를 끝까지 처리함
+    runner.work("n1")
+    failed = runner.queue.failed_shards()
+    assert len(failed) == 1
+    (errors,) = failed.values()
+    assert len(errors) == 2 and all("cannot parse poison.txt" in e for e in errors)
+    assert len(list(runner.queue.done_dir.glob("*.json"))) == 3
+
+    with pytest.raises(RuntimeError, match="1 shards failed"):
+        runner.reduce(wait=False)
+    assert StubText.saved == []
+
+
+def test_reduce_without_nodes_raises(runner, input_dir):
+    runner.plan(input_dir)
+    with pytest.raises(RuntimeError, match="3 shards are unfinished and all nodes have exited"):
+        runner.reduce(wait=False)
+    runner.cfg.DIST_LEASE_TIMEOUT = 0.05
+    with pytest.raises(RuntimeError, match="no node has held a lease"):
+        runner.reduce()
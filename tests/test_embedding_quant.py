@@ -0,0 +1,103 @@
+import numpy as np
+
+import time
+
+from dedup.embedding_quant import (
+    CodeStore,
+    band_greedy_edges,
+    binarize,
+    iter_hamming_candidates,
+    l2_normalize,
+    quantize_int8,
+    rescore_pairs,
+    simhash_bands,
+)
+
+
+def near_duplicates(n=200, dim=64, n_dup=40, noise=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal((n, dim))
+    dup = base[:n_dup] + noise * rng.standard_normal((n_dup, dim))
+    return l2_normalize(np.concatenate([base, dup])).astype(np.float32)
+
+
+def brute_force_pairs(vecs, threshold):
+    sims = vecs @ vecs.T
+    ii, jj = np.nonzero(np.triu(sims > threshold, k=1))
+    return set(zip(ii.tolist(), jj.tolist()))
+
+
+def test_int8_preserves_cosine():
+    vecs = near_duplicates()
+    codes = quantize_int8(vecs).astype(np.float32)
+    approx = l2_normalize(codes) @ l2_normalize(codes).T
+    assert np.abs(approx - vecs @ vecs.T).max() < 0.02
+
+
+def test_quantized_pairs_match_float(tmp_path):
+    vecs = near_duplicates()
+    expected = brute_force_pairs(vecs, 0.98)
+    assert expected
+    for mode in ("int8", "binary"):
+        store = CodeStore(mode, len(vecs), tmp_path / "cache.npy")
+        for s in range(0, len(vecs), 64):
+            store.add(s, vecs[s:s + 64])
+        bits = binarize(store.vecs, block_size=64)
+        found = set()
+        for ii, jj in iter_hamming_candidates(bits, max_dist=store.dim // 4, block_size=64):
+            found.update(rescore_pairs(store.vecs, ii, jj, 0.98))
+        store.close()
+        assert found == expected, mode
+
+
+def test_binary_store_removes_cache(tmp_path):
+    cache = tmp_path / "cache.npy"
+    store = CodeStore("binary", 4, cache)
+    store.add(0, np.ones((4, 8), dtype=np.float32))
+    assert cache.exists()
+    store.close()
+    assert not cache.exists()
+
+
+def test_simhash_bands_are_deterministic():
+    vecs = near_duplicates()
+    a = simhash_bands(vecs, n_bands=8, band_bits=12, seed=7)
+    b = simhash_bands(vecs, n_bands=8, band_bits=12, seed=7, block_size=17)
+    assert a.shape == (len(vecs), 8)
+    assert (a == b).all()
+    assert a.max() < 1 << 12
+
+
+def test_band_greedy_edges_cover_near_duplicates():
+    vecs = near_duplicates(noise=0.005)
+    bands = simhash_bands(vecs, n_bands=16, band_bits=16, seed=0)
+    found = set()
+    for b in range(bands.shape[1]):
+        ii, jj, sims = band_greedy_edges(vecs, bands[:, b], 0.98, block_rows=16)
+        assert (ii < jj).all() and (sims >= 0.98).all()
+        found.update(zip(ii.tolist(), jj.tolist()))
+    assert found == brute_force_pairs(vecs, 0.98)
+
+
+def test_band_greedy_edges_select():
+    vecs = near_duplicates(noise=0.005)
+    values = np.zeros(len(vecs), dtype=np.uint64)
+    select = np.arange(len(vecs)) >= 200
+    ii, jj, _ = band_greedy_edges(vecs, values, 0.98, select)
+    assert len(ii) == 0
+    ii, jj, _ = band_greedy_edges(vecs, values, 0.98)
+    assert set(zip(ii.tolist(), jj.tolist())) == {(i, 200 + i) for i in range(40)}
+
+
+def test_band_greedy_edges_tight_cluster():
+    # 서로 모두 유사한 큰 클러스터도 모든 쌍을 만들지 않고 첫 행에만 연결됨
+    rng = np.random.default_rng(0)
+    base = rng.standard_normal(64)
+    vecs = l2_normalize(base + 1e-3 * rng.standard_normal((6000, 64))).astype(np.float32)
+    values = np.zeros(len(vecs), dtype=np.uint64)
+    start = time.perf_counter()
+    ii, jj, sims = band_greedy_edges(vecs, values, 0.99)
+    assert time.perf_counter() - start < 10
+    assert (ii == 0).all()
+    assert (jj == np.arange(1, 6000)).all()
+    assert (sims >= 0.99).all()
@@ -0,0 +1,90 @@
+import logging
+
+import numpy as np
+import pytest
+
+pytest.importorskip("fiftyone")
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+
+from dedup_agent.config import Config, with_work_dir
+from dedup_agent.dedup.embedding_quant import CodeStore, l2_normalize
+from dedup_agent.dedup.image_fiftyone import ImageFiftyOne
+
+
+def make_image_dedup(tmp_path, mode, **overrides):
+    cfg = with_work_dir(Config(), tmp_path / "work")
+    cfg.WORK_DIR.mkdir(parents=True)
+    cfg.FIFTYONE_EMBEDDING_MODE = mode
+    cfg.FIFTYONE_BLOCK_SIZE = 32
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+    return ImageFiftyOne(cfg)
+
+
+def clustered_embeddings(seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal((60, 128))
+    dup = base[:15] + 0.01 * rng.standard_normal((15, 128))
+    # ReLU 이후 특징처럼 양수로 치우친 분포
+    return np.abs(np.concatenate([base, dup])).astype(np.float32)
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_pairs_match_float_pairs(tmp_path, mode):
+    emb = clustered_embeddings()
+    image = make_image_dedup(tmp_path, mode)
+    store = CodeStore(mode, len(emb), image.embedding_cache_path)
+    try:
+        for s in range(0, len(emb), 32):
+            store.add(s, emb[s:s + 32])
+        pairs = image._quantized_pairs(store)
+        # 재채점 중에는 store 를 닫지 않음 (소유자가 닫음)
+        assert store.vecs is not None
+    finally:
+        store.close()
+    assert sorted(pairs) == sorted(image._float_pairs(emb))
+    assert not image.embedding_cache_path.exists()
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_dedup_embeddings_removes_cache_on_error(tmp_path, mode, monkeypatch):
+    image = make_image_dedup(tmp_path, mode)
+
+    def boom(store):
+        raise RuntimeError("rescoring failed")
+
+    monkeypatch.setattr(image, "_quantized_pairs", boom)
+    with pytest.raises(RuntimeError):
+        image.dedup_embeddings([f"{i}.png" for i in range(75)], clustered_embeddings())
+    assert not image.embedding_cache_path.exists()
+
+
+def test_dedup_embeddings_groups_near_duplicates(tmp_path):
+    emb = clustered_embeddings()
+    paths = [f"{i:03d}.png" for i in range(len(emb))]
+    kept, dup_map = make_image_dedup(tmp_path, "int8").dedup_embeddings(paths, emb)
+    assert dup_map == {paths[60 + i]: paths[i] for i in range(15)}
+    assert kept == set(paths[:60])
+
+
+def test_report_agreement(tmp_path, caplog):
+    image = make_image_dedup(tmp_path, "int8")
+    dup_map = {"b": "a", "c": "a", "e": "d"}
+    ref_dup_map = {"b": "a", "c": "a", "f": "d"}
+    with caplog.at_level(logging.INFO, logger="ImageFiftyOne"):
+        image._report_agreement(dup_map, ref_dup_map, n=10)
+    msg = caplog.records[-1].getMessage()
+    # e, f 두 파일만 판정이 다름
+    assert "agreement=0.8000" in msg
+    assert "precision=0.6667" in msg
+    assert "recall=0.6667" in msg
+    assert "(2 mismatched files)" in msg
+
+
+def test_verify_mode_reports_full_agreement(tmp_path, caplog):
+    emb = clustered_embeddings()
+    image = make_image_dedup(tmp_path, "int8", FIFTYONE_VERIFY_QUANT=True)
+    with caplog.at_level(logging.INFO, logger="ImageFiftyOne"):
+        image.dedup_embeddings([f"{i:03d}.png" for i in range(len(emb))], emb)
+    assert any("agreement=1.0000" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,102 @@
+import pytest
+
+from utils.resource_governor import ResourceGovernor
+
+_TB = 1 << 40
+
+
+def make_governor(initial=4, maximum=64, **kwargs):
+    kwargs.setdefault("rss_budget", _TB)
+    return ResourceGovernor("test", initial, maximum=maximum, **kwargs)
+
+
+def test_grows_when_within_budget():
+    g = make_governor()
+    g.record(4, 1.0, 0)
+    assert g.size == 8
+    g.record(8, 1.0, 0)
+    assert g.size == 16
+
+
+def test_partial_batch_does_not_grow():
+    g = make_governor()
+    g.record(3, 1.0, 0)
+    assert g.size == 4
+
+
+def test_shrinks_on_memory_pressure():
+    g = make_governor(initial=16, rss_budget=1)
+    g.record(16, 1.0, 0)
+    assert g.size == 8
+
+
+def test_shrinks_on_latency_budget():
+    g = make_governor(initial=16, latency_budget=1.0)
+    g.record(16, 5.0, 0)
+    assert g.size == 8
+
+
+def test_single_slow_batch_does_not_cap():
+    g = make_governor()
+    g.record(4, 1.0, 0)  # 4 items/s -> 8
+    g.record(8, 8.0, 0)  # 1 item/s, 한 번만 느림
+    assert (g.size, g.maximum) == (8, 64)
+    g.record(8, 1.0, 0)
+    assert (g.size, g.maximum) == (16, 64)
+
+
+def test_sustained_slowdown_reverts_and_caps():
+    g = make_governor(patience=3)
+    g.record(4, 1.0, 0)
+    for _ in range(3):
+        g.record(8, 8.0, 0)
+    assert (g.size, g.maximum) == (4, 4)
+
+
+def test_work_weight_sets_throughput():
+    g = make_governor()
+    g.record(4, 2.0, 0, work=1000)
+    assert g.best_throughput == pytest.approx(500.0)
+
+
+def test_map_batches_retries_same_batch_after_oom():
+    g = make_governor(initial=16)
+    seen = []
+
+    def fn(batch):
+        if len(batch) > 4:
+            raise MemoryError
+        seen.extend(batch)
+        return len(batch)
+
+    out = g.map_batches(list(range(30)), fn)
+    assert seen == list(range(30))
+    assert sum(out) == 30
+    # OOM 이 난 크기 이상으로는 다시 키우지 않음
+    assert g.maximum <= 8
+
+
+def test_map_batches_reraises_other_errors():
+    g = make_governor()
+
+    def fn(batch):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        g.map_batches([1, 2, 3], fn)
+
+
+def test_oom_at_minimum_is_reraised():
+    g = make_governor(initial=1)
+
+    def fn(batch):
+        raise MemoryError
+
+    with pytest.raises(MemoryError):
+        g.map_batches([1], fn)
+
+
+def test_share_splits_budget():
+    g = make_governor(rss_budget=1000)
+    assert g.share(4).rss_budget == 250
+    assert g.rss_budget == 1000
@@ -0,0 +1,63 @@
+import random
+
+from utils.text_io import detect_encoding, iter_text_chunks, iter_windows, read_text, read_text_auto
+
+
+def test_fallback_past_probe_prefix(tmp_path):
+    # 앞부분은 ASCII 라 utf-8 로 판별되지만 뒤쪽은 cp949
+    p = tmp_path / "doc.txt"
+    p.write_bytes(b"a" * 100 + "한글 문서".encode("cp949"))
+    assert detect_encoding(p, probe_bytes=10) == "utf-8"
+    for mmap_threshold in (0, 1 << 30):
+        assert read_text_auto(p, probe_bytes=10, mmap_threshold=mmap_threshold) == "a" * 100 + "한글 문서"
+
+
+def test_undecodable_returns_none(tmp_path):
+    p = tmp_path / "bin.txt"
+    p.write_bytes(b"\xff\xfe\xfa" * 10)
+    assert read_text_auto(p, probe_bytes=4, mmap_threshold=0) is None
+
+
+def test_probe_cut_inside_multibyte_char(tmp_path):
+    p = tmp_path / "doc.txt"
+    p.write_text("가나다라", encoding="utf-8")
+    assert detect_encoding(p, probe_bytes=4) == "utf-8"
+
+
+def test_chunks_split_multibyte_chars(tmp_path):
+    p = tmp_path / "doc.txt"
+    text = "중복 제거 테스트 " * 50
+    p.write_text(text, encoding="utf-8")
+    chunks = list(iter_text_chunks(p, "utf-8", mmap_threshold=0, chunk_bytes=7))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    assert read_text(p, "utf-8", mmap_threshold=0) == text
+
+
+def _random_text(rng, n_words):
+    words = ["가나다", "hello", "world", "문서", "중복", "제거", "abc", "데이터"]
+    return " ".join(rng.choice(words) for _ in range(n_words))
+
+
+def test_windows_do_not_depend_on_chunking():
+    text = _random_text(random.Random(0), 3000)
+    whole = list(iter_windows([text], window_chars=500, overlap=50))
+    pieces = [text[i:i + 333] for i in range(0, len(text), 333)]
+    assert list(iter_windows(pieces, window_chars=500, overlap=50)) == whole
+    # 겹침을 빼고 이어 붙이면 원문
+    assert whole[0] + "".join(w[50:] for w in whole[1:]) == text
+
+
+def test_windows_align_on_shared_section():
+    rng = random.Random(1)
+    shared = _random_text(rng, 3000)
+    a = list(iter_windows([_random_text(rng, 700) + shared], window_chars=500, overlap=50))
+    b = list(iter_windows(["머리말 " * 123 + shared], window_chars=500, overlap=50))
+    common = set(a) & set(b)
+    # 처음/끝 윈도우를 제외한 공유 구간 윈도우는 위치와 무관하게 같아야 함
+    assert len(common) >= len(b) - 3
+
+
+def test_short_and_empty_text():
+    assert list(iter_windows(["짧은 글"], window_chars=500, overlap=50)) == ["짧은 글"]
+    assert list(iter_windows([], window_chars=500, overlap=50)) == [""]
@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("unisim")
+pytest.importorskip("pandas")
+
+from dedup_agent.config import Config, ensure_dirs, with_work_dir
+from dedup_agent.dedup.embedding_quant import l2_normalize
+from dedup_agent.dedup.text_unisim import TextUnisim
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    cfg = with_work_dir(Config(), tmp_path / "work")
+    ensure_dirs(cfg)
+    return cfg
+
+
+def test_oversized_files_are_routed_to_window_mode(cfg, monkeypatch):
+    (cfg.TEXT_TEMP_DIR / "small.txt").write_text("짧은 문서")
+    (cfg.TEXT_TEMP_DIR / "large.txt").write_text("큰 문서 " * 1000)
+    cfg.TEXT_MMAP_THRESHOLD = 1024
+    text = TextUnisim(cfg)
+    calls = []
+    monkeypatch.setattr(text, "_deduplicate_windowed", lambda files: calls.append(files) or ({str(files[0])}, {}))
+    monkeypatch.setattr(text, "_deduplicate", lambda *a, **k: pytest.fail("whole-document path used"))
+    monkeypatch.setattr(text, "save_results", lambda kept, dup: None)
+    text.run()
+    assert [p.name for p in calls[0]] == ["large.txt", "small.txt"]
+
+
+def test_embed_shard_rejects_oversized_files(cfg):
+    (cfg.TEXT_TEMP_DIR / "large.txt").write_text("큰 문서 " * 1000)
+    cfg.TEXT_MMAP_THRESHOLD = 1024
+    with pytest.raises(ValueError, match="TEXT_MMAP_THRESHOLD"):
+        TextUnisim(cfg).embed_shard()
+
+
+def random_hangul(rng, n_chars):
+    # 서로 무관한 문서끼리는 유사도가 낮도록 음절 전체에서 무작위 추출
+    return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(n_chars))
+
+
+def iter_all(text, path):
+    rate, text.window_sample_rate = text.window_sample_rate, 1
+    try:
+        yield from text._iter_doc_windows(path, "utf-8")
+    finally:
+        text.window_sample_rate = rate
+
+
+def test_window_sampling_is_consistent_across_document_sizes(cfg):
+    import random
+
+    rng = random.Random(0)
+    chapter = random_hangul(rng, 120_000)
+    short = cfg.TEXT_TEMP_DIR / "short.txt"
+    long = cfg.TEXT_TEMP_DIR / "long.txt"
+    short.write_text(random_hangul(rng, 5_000) + chapter)
+    long.write_text(random_hangul(rng, 100_000) + chapter + random_hangul(rng, 40_000))
+    cfg.TEXT_WINDOW_SAMPLE_RATE = 3
+    text = TextUnisim(cfg)
+    a = list(text._iter_doc_windows(short, "utf-8"))
+    b = set(text._iter_doc_windows(long, "utf-8"))
+    assert 3 <= len(a) < len(list(iter_all(text, short)))
+    coverage = sum(w in b for w in a) / len(a)
+    assert coverage >= 0.7
+
+
+@pytest.mark.parametrize("coverage, part_is_dup", [(0.8, False), (0.3, True)])
+def test_windowed_coverage_decision(cfg, coverage, part_is_dup):
+    import random
+
+    rng = random.Random(1)
+    base = random_hangul(rng, 60_000)
+    d = cfg.TEXT_TEMP_DIR
+    (d / "a.txt").write_text(base)
+    (d / "b.txt").write_text(base + random_hangul(rng, 500))  # 거의 전부 공유
+    (d / "c.txt").write_text(base[:30_000] + random_hangul(rng, 30_000))  # 절반만 공유
+    (d / "d.txt").write_text(random_hangul(rng, 60_000))  # 무관
+    cfg.TEXT_WINDOW_COVERAGE = coverage
+    kept, dup_map = TextUnisim(cfg)._deduplicate_windowed(sorted(d.glob("*.txt")))
+    names = {k: v for k, v in ((p.rsplit("/", 1)[-1], s.rsplit("/", 1)[-1]) for p, s in dup_map.items())}
+    assert names.get("b.txt") == "a.txt"
+    assert ("c.txt" in names) == part_is_dup
+    assert "d.txt" not in names
+    assert str(d / "a.txt") in kept and str(d / "d.txt") in kept
+
+
+def sequential_reference(paths, emb, threshold):
+    # 순차 모드 규칙: 앞서 유지된 문서 중 유사도 최대(동률이면 앞 문서)가 threshold 이상이면 중복
+    kept, dup_map = [], {}
+    for i, path in enumerate(paths):
+        if kept:
+            sims = emb[kept] @ emb[i]
+            best = np.lexsort((np.array(kept), -sims))[0]
+            if sims[best] >= threshold:
+                dup_map[path] = paths[kept[best]]
+                continue
+        kept.append(i)
+    return {paths[k] for k in kept}, dup_map
+
+
+def clustered_embeddings(n=1500, n_base=300, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    base = l2_normalize(rng.standard_normal((n_base, dim)))
+    rows = []
+    for _ in range(n):
+        row = base[rng.integers(n_base)]
+        if rng.random() >= 0.3:  # 나머지는 완전히 같은 임베딩
+            row = row + rng.choice([0.003, 0.01, 0.05]) * rng.standard_normal(dim)
+        rows.append(row)
+    return l2_normalize(np.array(rows)).astype(np.float32)
+
+
+@pytest.mark.parametrize("pool", [False, True])
+def test_dedup_embeddings_matches_sequential_reference(cfg, pool):
+    emb = clustered_embeddings()
+    paths = [f"/docs/{i:05d}.txt" for i in range(len(emb))]
+    text = TextUnisim(cfg)
+    if pool:
+        text.num_workers = 3
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            got = text.dedup_embeddings(paths, emb, executor=ex)
+    else:
+        got = text.dedup_embeddings(paths, emb)
+    assert got == sequential_reference(paths, emb, cfg.UNISIM_THRESHOLD)
+    assert not text.embedding_cache_path.exists()
+
+
+def test_dedup_embeddings_tight_cluster(cfg):
+    rng = np.random.default_rng(0)
+    emb = l2_normalize(rng.standard_normal(64) + 1e-3 * rng.standard_normal((6000, 64))).astype(np.float32)
+    paths = [f"/docs/{i:05d}.txt" for i in range(len(emb))]
+    kept, dup_map = TextUnisim(cfg).dedup_embeddings(paths, emb)
+    assert kept == {paths[0]}
+    assert set(dup_map.values()) == {paths[0]}
+
+
+def test_resolve_follows_sequential_order():
+    edge = lambda i, j, s: (np.array(i), np.array(j), np.array(s, dtype=np.float32))
+    # 0~1, 1~2: 1 이 중복이므로 2 는 유지
+    src, *_ = TextUnisim._resolve(3, [edge([0, 1], [1, 2], [0.995, 0.995])])
+    assert src.tolist() == [-1, 0, -1]
+    # 유지된 이웃 중 유사도가 가장 높은 문서, 동률이면 앞 문서가 원본
+    src, *_ = TextUnisim._resolve(4, [edge([0, 1], [3, 3], [0.991, 0.995]), edge([2], [3], [0.995])])
+    assert src.tolist() == [-1, -1, -1, 1]
+    src, *_ = TextUnisim._resolve(2, [])
+    assert src.tolist() == [-1, -1]
+
+
+def test_parallel_mode_agrees_with_search_mode(cfg):
+    import random
+
+    rng = random.Random(2)
+    d = cfg.TEXT_TEMP_DIR
+    docs = [random_hangul(rng, 400) for _ in range(12)]
+    for k, doc in enumerate(docs):
+        (d / f"{k:02d}.txt").write_text(doc)
+        if k % 3 == 0:
+            (d / f"{k:02d}_copy.txt").write_text(doc)
+    files = sorted(d.glob("*.txt"))
+
+    text = TextUnisim(cfg)
+    expected = text._deduplicate(text._iter_texts(files), len(files))
+    cfg.TEXT_NUM_WORKERS = 2
+    assert TextUnisim(cfg)._deduplicate_sharded(files) == expected
+    assert len(expected[1]) == 4
@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from core.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(tmp_path / "queue", lease_timeout=60.0)
+
+
+def test_acquire_leases_each_shard_once(queue):
+    ids = queue.plan([["a.txt"], ["b.txt"]])
+    assert queue.acquire("n1") == ids[0]
+    assert queue.acquire("n2") == ids[1]
+    assert queue.acquire("n3") is None
+    assert queue.load(ids[0], "n1") == ["a.txt"]
+    assert not queue.finished()
+
+
+def test_plan_twice_raises(queue):
+    queue.plan([["a.txt"]])
+    with pytest.raises(RuntimeError):
+        queue.plan([["b.txt"]])
+
+
+def test_empty_plan_is_finished(queue):
+    assert not queue.finished()
+    assert queue.plan([]) == []
+    assert queue.acquire("n1") is None
+    assert queue.finished()
+
+
+def test_complete_marks_shard_done(queue):
+    (sid,) = queue.plan([["a.txt"]])
+    queue.acquire("n1")
+    assert queue.complete(sid, "n1")
+    assert queue.finished()
+
+
+def test_reclaim_expired_lease(queue):
+    (sid,) = queue.plan([["a.txt"]])
+    queue.acquire("n1")
+    # 하트비트가 끊긴 것처럼 리스 mtime 을 과거로 돌림
+    lease = queue._lease_path(sid, "n1")
+    old = time.time() - 120
+    os.utime(lease, (old, old))
+
+    assert queue.reclaim_expired() == 1
+    assert queue.acquire("n2") == sid
+    # 회수된 노드는 완료 처리에 실패하고, 새 노드가 완료함
+    assert not queue.complete(sid, "n1")
+    assert queue.complete(sid, "n2")
+    assert queue.finished()
+
+
+def test_fresh_lease_is_not_reclaimed(queue):
+    queue.plan([["a.txt"]])
+    queue.acquire("n1")
+    assert queue.reclaim_expired() == 0
+
+
+def test_double_publish_keeps_first_result(queue):
+    (sid,) = queue.plan([["a.txt"]])
+    for node in ("n1", "n2"):
+        stage = queue.staging_dir(sid, node)
+        (stage / "owner.txt").write_text(node)
+    queue.publish(sid, "n1")
+    queue.publish(sid, "n2")
+
+    result = queue.result_dir(sid)
+    assert (result / "owner.txt").read_text() == "n1"
+    assert not (queue.results_dir / f".{sid}.n2.tmp").exists()
+
+
+def test_release_retries_then_fails(tmp_path):
+    queue = WorkQueue(tmp_path / "queue", lease_timeout=60.0, max_attempts=2)
+    (sid,) = queue.plan([["a.txt"]])
+    assert queue.acquire("n1") == sid
+    queue.staging_dir(sid, "n1")
+    queue.release(sid, "n1", "boom 1")
+    assert not (queue.results_dir / f".{sid}.n1.tmp").exists()
+    assert not queue.has_leases()
+    assert queue.unfinished_shards() == [sid]
+
+    assert queue.acquire("n2") == sid
+    queue.release(sid, "n2", "boom 2")
+    assert queue.acquire("n3") is None
+    assert queue.failed_shards() == {sid: ["boom 1", "boom 2"]}
+    assert queue.finished()
+
+
+def test_expired_lease_counts_as_attempt(tmp_path):
+    queue = WorkQueue(tmp_path / "queue", lease_timeout=60.0, max_attempts=1)
+    (sid,) = queue.plan([["a.txt"]])
+    queue.acquire("n1")
+    old = time.time() - 120
+    os.utime(queue._lease_path(sid, "n1"), (old, old))
+
+    assert queue.reclaim_expired() == 1
+    assert queue.failed_shards() == {sid: ["lease expired on node n1"]}
+    # 회수된 노드의 반납/완료는 무시됨
+    queue.release(sid, "n1", "late")
+    assert not queue.complete(sid, "n1")
+    assert queue.failed_shards()[sid] == ["lease expired on node n1"]
@@ -2,6 +2,10 @@ from pathlib import Path
 import shutil
 import os
 import errno
+from concurrent.futures import ThreadPoolExecutor
+
+from .progress import progress_bar
+from .resource_governor import ResourceGovernor
 
 def safe_move(src: Path, dst_dir: Path) -> Path:
     """cross-device 환경에서도 안전하게 파일을 이동한다."""
@@ -37,6 +41,33 @@ def safe_copy(src: Path, dst_dir: Path) -> Path:
     shutil.copy2(str(src), str(final_dst))
     return final_dst
 
+def copy_files(srcs: list[Path], dst_dir: Path, governor: ResourceGovernor, desc: str = "Copying") -> list[Path]:
+    """여러 파일을 스레드로 병렬 복사한다. 동시 복사 수는 governor 가 처리량(바이트/초)을 보며 조절한다.
+
+    이름 충돌 처리는 safe_copy 와 같으며, 대상 이름은 복사 전에 순차적으로 정한다.
+    """
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    taken = set()
+    pairs = []
+    for src in srcs:
+        dst = dst_dir / src.name
+        counter = 1
+        while dst.exists() or dst in taken:
+            dst = dst_dir / f"{src.stem} ({counter}){src.suffix}"
+            counter += 1
+        taken.add(dst)
+        pairs.append((src, dst, src.stat().st_size))
+
+    with ThreadPoolExecutor(max_workers=governor.maximum) as ex, \
+            progress_bar(None, desc=desc, total=len(pairs)) as pbar:
+        def _copy_batch(batch):
+            # 배치 크기 = 동시에 진행되는 복사 수
+            list(ex.map(lambda sd: shutil.copy2(str(sd[0]), str(sd[1])), batch))
+            pbar.update(len(batch))
+        # 파일 크기가 제각각이므로 파일 수가 아닌 바이트 수로 처리량을 잼
+        governor.map_batches(pairs, _copy_batch, weight=lambda batch: sum(size for _, _, size in batch))
+    return [dst for _, dst, _ in pairs]
+
 def cleanup_temp_dirs(cfg):
     """임시 작업 디렉터리를 정리합니다."""
     temp_dirs = [
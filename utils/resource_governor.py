@@ -0,0 +1,222 @@
+from contextlib import contextmanager
+from typing import Callable, Optional, Sequence, TypeVar
+import copy
+import logging
+import os
+import resource
+import time
+
+T = TypeVar("T")
+
+_MB = 1024 * 1024
+
+
+def current_rss() -> int:
+    """현재 프로세스의 RSS(바이트). /proc 이 없으면 최대 RSS 로 대체한다."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Linux 에서 ru_maxrss 단위는 KB
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def available_memory() -> Optional[int]:
+    """시스템 가용 메모리(MemAvailable, 바이트). 알 수 없으면 None."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def total_memory() -> int:
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def is_oom(e: BaseException) -> bool:
+    """MemoryError 또는 CUDA OOM(torch.cuda.OutOfMemoryError 등) 여부."""
+    return isinstance(e, MemoryError) or "out of memory" in str(e).lower()
+
+
+def max_workers(cfg) -> int:
+    return cfg.GOVERNOR_MAX_WORKERS or os.cpu_count() or 1
+
+
+class ResourceGovernor:
+    """측정된 항목당 메모리와 처리량을 기준으로 배치 크기(또는 워커 수)를 조절한다.
+
+    - 배치 지연과 RSS 가 예산 안이고 처리량이 떨어지지 않으면 크기를 2배로 늘린다.
+    - 늘린 뒤 처리량 저하가 patience 배치 연속으로 이어지면 이전 크기로 되돌리고 그 값을 상한으로
+      고정한다. 한 번 느린 배치(디스크 캐시, GC 등)로는 상한이 바뀌지 않는다.
+    - 처리량은 기본적으로 항목 수/초이며, map_batches 에 weight 를 주면 작업량(예: 바이트)/초로 잰다.
+    - RSS/지연 예산 초과, 시스템 가용 메모리 부족, OOM 발생 시 크기를 절반으로 줄인다.
+      OOM 이 난 경우에는 그 크기 이상으로 다시 키우지 않는다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 256,
+        rss_budget: Optional[int] = None,
+        min_free: int = 0,
+        latency_budget: Optional[float] = None,
+        patience: int = 3,
+    ):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.size = min(max(initial, minimum), self.maximum)
+        self.rss_budget = rss_budget if rss_budget is not None else int(total_memory() * 0.75)
+        self.min_free = min_free
+        self.latency_budget = latency_budget
+        self.item_bytes = 0.0  # 항목당 메모리 증가량 추정치 (EMA)
+        self.best_throughput = 0.0
+        self.patience = patience
+        self._grown_from = None
+        self._slow_batches = 0
+        self.logger = logging.getLogger(f"{self.__class__.__name__}[{name}]")
+
+    @classmethod
+    def from_config(cls, cfg, name: str, initial: int, maximum: Optional[int] = None) -> "ResourceGovernor":
+        budget_mb = cfg.GOVERNOR_RSS_BUDGET_MB
+        return cls(
+            name,
+            initial,
+            maximum=maximum or cfg.GOVERNOR_MAX_BATCH,
+            rss_budget=budget_mb * _MB if budget_mb else None,
+            min_free=cfg.GOVERNOR_MIN_FREE_MB * _MB,
+            latency_budget=cfg.GOVERNOR_LATENCY_BUDGET or None,
+        )
+
+    def share(self, parts: int) -> "ResourceGovernor":
+        """여러 프로세스가 나눠 쓰도록 RSS 예산을 parts 등분한 사본을 반환한다."""
+        gov = copy.copy(self)
+        gov.rss_budget = self.rss_budget // max(parts, 1)
+        return gov
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("logger")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(f"{self.__class__.__name__}[{self.name}]")
+
+    def _under_pressure(self, rss: int) -> bool:
+        if rss > self.rss_budget:
+            return True
+        avail = available_memory()
+        return avail is not None and avail < self.min_free
+
+    def _resize(self, new_size: int, reason: str) -> None:
+        new_size = min(max(new_size, self.minimum), self.maximum)
+        if new_size != self.size:
+            self.logger.debug("size %d -> %d (%s)", self.size, new_size, reason)
+            self.size = new_size
+
+    def shrink(self, reason: str) -> bool:
+        """크기를 절반으로 줄인다. 이미 최소값이면 False."""
+        if self.size <= self.minimum:
+            return False
+        self._grown_from = None
+        self._slow_batches = 0
+        self._resize(self.size // 2, reason)
+        return True
+
+    def on_oom(self) -> bool:
+        """OOM 이 난 크기 미만으로 상한을 낮추고 크기를 절반으로 줄인다."""
+        self.logger.warning("Out of memory at size %d; shrinking.", self.size)
+        self.maximum = max(self.size // 2, self.minimum)
+        return self.shrink("oom")
+
+    def observe_item_bytes(self, per_item: int) -> None:
+        """다른 프로세스 등에서 직접 측정한 항목당 메모리를 추정치에 반영한다."""
+        if per_item > 0:
+            self.item_bytes = per_item if not self.item_bytes else 0.7 * self.item_bytes + 0.3 * per_item
+
+    @contextmanager
+    def measure(self, n_items: int, work: Optional[float] = None):
+        rss0 = current_rss()
+        t0 = time.perf_counter()
+        yield
+        self.record(n_items, time.perf_counter() - t0, current_rss() - rss0, work)
+
+    def record(self, n_items: int, elapsed: float, rss_delta: int, work: Optional[float] = None) -> None:
+        """배치 하나의 측정값을 반영한다. work 가 있으면 처리량을 work/초로 계산한다."""
+        if n_items <= 0:
+            return
+        self.observe_item_bytes(max(rss_delta, 0) / n_items)
+        throughput = (n_items if work is None else work) / max(elapsed, 1e-9)
+        rss = current_rss()
+
+        if self._under_pressure(rss):
+            self.shrink("memory pressure")
+            return
+        if self.latency_budget is not None and elapsed > self.latency_budget:
+            self.shrink("latency budget")
+            return
+        if self._grown_from is not None and throughput < 0.9 * self.best_throughput:
+            self._slow_batches += 1
+            if self._slow_batches < self.patience:
+                return
+            # 키운 뒤 계속 느려짐: 되돌리고 상한 고정
+            self.maximum = self._grown_from
+            self._resize(self._grown_from, "throughput dropped")
+            self._grown_from = None
+            self._slow_batches = 0
+            return
+        self._slow_batches = 0
+        self.best_throughput = max(self.best_throughput, throughput)
+        # 꽉 찬 배치에서만 확장 판단 (마지막 자투리 배치 제외)
+        if n_items < self.size or self.size >= self.maximum:
+            self._grown_from = None
+            return
+        new_size = min(self.size * 2, self.maximum)
+        projected = rss + self.item_bytes * (new_size - self.size)
+        fits_latency = self.latency_budget is None or elapsed * new_size / self.size <= self.latency_budget
+        if projected <= self.rss_budget and fits_latency:
+            self._grown_from = self.size
+            self._resize(new_size, "within budget")
+        else:
+            self._grown_from = None
+
+    def fit(self, per_item_bytes: int) -> int:
+        """per_item_bytes 짜리 항목을 동시에 몇 개 처리할 수 있는지 (minimum ~ size 범위)."""
+        room = self.rss_budget - current_rss()
+        avail = available_memory()
+        if avail is not None:
+            room = min(room, avail - self.min_free)
+        n = int(room // per_item_bytes) if per_item_bytes > 0 else self.size
+        return min(max(n, self.minimum), self.size)
+
+    def map_batches(
+        self,
+        items: Sequence,
+        fn: Callable[[Sequence], T],
+        weight: Optional[Callable[[Sequence], float]] = None,
+    ) -> list[T]:
+        """items 를 현재 크기의 배치로 잘라 fn 에 넘기고, 측정 결과로 다음 배치 크기를 조절한다.
+
+        weight 가 주어지면 배치의 작업량(예: 바이트 수)으로 처리량을 잰다.
+        OOM 이 나면 크기를 줄여 같은 배치를 다시 시도한다.
+        """
+        out = []
+        i = 0
+        while i < len(items):
+            batch = items[i:i + self.size]
+            try:
+                with self.measure(len(batch), weight(batch) if weight else None):
+                    out.append(fn(batch))
+            except Exception as e:
+                if not is_oom(e) or not self.on_oom():
+                    raise
+                continue
+            i += len(batch)
+        return out
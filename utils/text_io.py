@@ -0,0 +1,151 @@
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import codecs
+import mmap
+
+import numpy as np
+
+ENCODINGS = ("utf-8", "cp949", "euc-kr")
+
+# 내용 기반 윈도우 경계 판정용 롤링 해시 파라미터
+_CUT_GRAM = 16  # 경계 판정에 보는 직전 문자 수
+_CUT_BASE = np.uint64(1000003)
+_CUT_MIX = np.uint64(0x9E3779B97F4A7C15)
+_CUT_BLOCK = 1 << 20  # 해시 계산 시 한 번에 처리할 문자 수
+
+
+def detect_encoding(path: Path, probe_bytes: int, encodings=ENCODINGS) -> Optional[str]:
+    """파일 앞부분(probe_bytes)만 읽어 디코딩 가능한 첫 인코딩을 반환한다."""
+    with open(path, "rb") as f:
+        head = f.read(probe_bytes)
+        at_eof = not f.read(1)
+    for enc in encodings:
+        # 앞부분이 멀티바이트 문자 중간에서 잘릴 수 있으므로 incremental decoder 사용
+        decoder = codecs.getincrementaldecoder(enc)()
+        try:
+            decoder.decode(head, final=at_eof)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def iter_text_chunks(path: Path, encoding: str, mmap_threshold: int, chunk_bytes: int) -> Iterator[str]:
+    """파일을 디코딩된 문자열 조각으로 순차 반환한다.
+
+    mmap_threshold 이상인 파일은 mmap 으로 열어 chunk_bytes 단위로만 읽으므로
+    전체 바이트 버퍼를 한 번에 메모리에 올리지 않는다.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return
+    decoder = codecs.getincrementaldecoder(encoding)()
+    if size < mmap_threshold:
+        yield decoder.decode(path.read_bytes(), final=True)
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for off in range(0, size, chunk_bytes):
+            end = min(off + chunk_bytes, size)
+            yield decoder.decode(mm[off:end], final=end >= size)
+
+
+def read_text(path: Path, encoding: str, mmap_threshold: int) -> str:
+    """파일 전체를 문자열 하나로 디코딩한다.
+
+    mmap_threshold 이상인 파일은 mmap 버퍼를 그대로 디코딩하므로 바이트 사본을 만들지 않는다.
+    결과 문자열 자체는 메모리에 올라가므로, 문서 크기와 무관하게 메모리를 제한하려면
+    iter_text_chunks 를 스트림으로 소비해야 한다.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return ""
+    if size < mmap_threshold:
+        return path.read_bytes().decode(encoding)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return str(mm, encoding)
+
+
+def read_text_auto(path: Path, probe_bytes: int, mmap_threshold: int, encodings=ENCODINGS) -> Optional[str]:
+    """인코딩을 앞부분으로 한 번 판별해 읽고, 앞부분 이후에서 실패하면 나머지 후보로 재시도한다.
+
+    어떤 후보로도 읽을 수 없으면 None.
+    """
+    enc = detect_encoding(path, probe_bytes, encodings)
+    if enc is None:
+        return None
+    for cand in encodings[encodings.index(enc):]:
+        try:
+            return read_text(path, cand, mmap_threshold)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def _cut_points(text: str, lo: int, avg: int) -> list[int]:
+    """text[lo:] 구간에서 직전 _CUT_GRAM 문자의 해시가 조건을 만족하는 경계 위치(문자 뒤 오프셋)를 반환한다.
+
+    해시는 위치와 무관하게 주변 문자에만 의존하므로 같은 내용에는 같은 경계가 생긴다.
+    """
+    lo = max(lo, _CUT_GRAM - 1)
+    cuts = []
+    for b0 in range(lo, len(text), _CUT_BLOCK):
+        b1 = min(b0 + _CUT_BLOCK, len(text))
+        cps = np.frombuffer(
+            text[b0 - _CUT_GRAM + 1:b1].encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        ).astype(np.uint64)
+        n = len(cps) - _CUT_GRAM + 1
+        h = np.zeros(n, dtype=np.uint64)
+        for t in range(_CUT_GRAM):
+            h = h * _CUT_BASE + cps[t:t + n]
+        hit = ((h * _CUT_MIX) >> np.uint64(40)) % np.uint64(avg) == 0
+        cuts.extend((np.nonzero(hit)[0] + b0 + 1).tolist())
+    return cuts
+
+
+def iter_windows(chunks: Iterable[str], window_chars: int, overlap: int) -> Iterator[str]:
+    """디코딩된 텍스트 조각 스트림을 내용 기반 경계의 윈도우로 나눠 순차 반환한다.
+
+    경계는 롤링 해시로 정하므로(평균 간격 window_chars - overlap, 최소 1/4 배 ~ 최대 2배)
+    같은 구간이 문서마다 다른 위치에 있어도 구간 안에서는 같은 윈도우가 만들어진다.
+    각 윈도우 앞에는 직전 구간의 마지막 overlap 문자를 붙인다.
+    메모리에는 아직 경계가 정해지지 않은 구간과 입력 조각 하나만 올라간다.
+    """
+    avg = window_chars - overlap
+    min_len = max(avg // 4, 1)
+    max_len = avg * 2
+    buf, start, scanned = "", 0, 0
+    cuts: deque[int] = deque()
+    tail = ""
+    emitted = False
+
+    def _emit(end: int) -> str:
+        nonlocal tail, emitted
+        window = tail + buf[start:end]
+        tail = window[-overlap:] if overlap else ""
+        emitted = True
+        return window
+
+    for chunk in chunks:
+        if start:
+            # 이미 내보낸 부분을 버리고 오프셋을 당김 (조각이 들어올 때만 복사)
+            buf = buf[start:]
+            cuts = deque(c - start for c in cuts)
+            scanned -= start
+            start = 0
+        buf += chunk
+        cuts.extend(_cut_points(buf, scanned, avg))
+        scanned = len(buf)
+        while True:
+            while cuts and cuts[0] - start < min_len:
+                cuts.popleft()
+            if cuts and cuts[0] - start <= max_len:
+                end = cuts.popleft()
+            elif len(buf) - start >= max_len:
+                end = start + max_len
+            else:
+                break
+            yield _emit(end)
+            start = end
+    if start < len(buf) or not emitted:
+        yield _emit(len(buf))